@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
 from django.core.management.utils import get_random_secret_key
@@ -51,16 +52,18 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'task_manager.authentication.CachedJWTAuthentication',
     ),
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'task_manager.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'task_manager.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,15 +97,82 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.postgresql'),
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'False') == 'True',
     }
 }
 
+# Connection pool of PostgreSQL with psycopg 3 (pip install "psycopg[pool]"); it replaces persistent connections.
+if os.getenv('DB_POOL', 'False') == 'True':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        },
+    }
+
+# Optional read replica: GET requests to the views marked `use_replica` read from it (see task_manager.routers).
+# Its settings default to the primary's, so setting DB_REPLICA_HOST (or DB_REPLICA_NAME for SQLite) is enough.
+DATABASE_REPLICA = None
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASE_REPLICA = 'replica'
+    DATABASES[DATABASE_REPLICA] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME') or DATABASES['default']['NAME'],
+        'USER': os.getenv('DB_REPLICA_USER') or DATABASES['default']['USER'],
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD') or DATABASES['default']['PASSWORD'],
+        'HOST': os.getenv('DB_REPLICA_HOST') or DATABASES['default']['HOST'],
+        'PORT': os.getenv('DB_REPLICA_PORT') or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['task_manager.routers.ReplicaRouter']
+
+# After a request writes to the primary, that browser reads from the primary for this many seconds, so it sees
+# its own changes despite replication lag. Data read from the replica is cached no longer than this either.
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The default file cache is shared by every worker on the host, so invalidations are seen by all of them.
+# Point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached when running on several hosts.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'task_manager_cache')),
+        'KEY_PREFIX': 'task_manager',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+        },
+    }
+}
+
+# Rendered task rows are keyed on a per-list version, so this only bounds how long unused entries linger.
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '3600'))
+
+# Sessions and the request user are read from the cache first, which saves two queries per request.
+# Logouts and password changes are only seen by the processes sharing that cache, so a local-memory cache
+# is only suitable for a single worker process.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# Sessions store the path of the backend that logged the user in and are only accepted while it is listed here.
+# ModelBackend stays after the cached backend so the sessions opened before the switch keep working; remove it
+# once they have expired (SESSION_COOKIE_AGE). It never checks passwords: the cached backend ends every login
+# attempt, failed ones included.
+AUTHENTICATION_BACKENDS = [
+    'task_manager.authentication.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -137,6 +207,36 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Performance instrumentation
+# Views declaring a `query_budget` raise when they exceed it if this is enabled, and only log a warning otherwise.
+# Opt-in: the budget tests enable it, and it should stay off on servers that users reach.
+QUERY_BUDGET_ENFORCE = os.getenv('QUERY_BUDGET_ENFORCE', 'False') == 'True'
+
+# Serve the task list overview, list detail and calendar events with the async views (task_manager.async_views)
+# instead of the sync ones. Only useful when running under an ASGI server such as uvicorn.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+
+# Fans task change events out to the live update streams of the task list pages (see task_manager.events).
+# The in-memory broker only reaches pages connected to the same server process.
+TASK_EVENTS_BROKER = os.getenv('TASK_EVENTS_BROKER', 'task_manager.events.InMemoryBroker')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'task_manager.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('PERFORMANCE_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,66 @@
+from rest_framework import routers, viewsets
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+
+from task_manager.caching import get_accessible_task_list_ids
+from task_manager.models import TaskList, Task, Category
+from task_manager.purge import soft_delete_task_list
+from task_manager.serializers import TaskListSerializer, TaskSerializer, CategorySerializer
+
+
+class IdCursorPagination(CursorPagination):
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class ApiRootView(routers.APIRootView):
+    query_budget = 1
+
+
+class TaskListViewSet(viewsets.ModelViewSet):
+    query_budget = {'GET': 4, 'DELETE': 5}
+    serializer_class = TaskListSerializer
+    pagination_class = IdCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return TaskList.objects.filter(
+            id__in=get_accessible_task_list_ids(self.request.user)
+        ).select_related('created_by').prefetch_related('shared_with')
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    def perform_destroy(self, instance):
+        soft_delete_task_list(instance)
+
+
+class TaskViewSet(viewsets.ModelViewSet):
+    query_budget = {'GET': 4, 'POST': 13, 'PUT': 6, 'PATCH': 6, 'DELETE': 6}
+    serializer_class = TaskSerializer
+    pagination_class = IdCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        tasks = Task.objects.filter(
+            task_list_id__in=get_accessible_task_list_ids(self.request.user)
+        ).select_related('task_list', 'category').prefetch_related('assigned_to')
+        task_list_id = self.request.query_params.get('task_list')
+        if task_list_id and task_list_id.isdigit():
+            tasks = tasks.filter(task_list_id=task_list_id)
+        return tasks
+
+
+class CategoryViewSet(viewsets.ModelViewSet):
+    query_budget = {'GET': 3, 'PUT': 6, 'PATCH': 6, 'DELETE': 8}
+    serializer_class = CategorySerializer
+    pagination_class = IdCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Category.objects.filter(created_by=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
@@ -0,0 +1,99 @@
+"""
+Moving completed tasks to the ArchivedTask table and back.
+
+No completion time is stored, so a task is archived once it is completed and has not changed for the given
+number of days: its updated_at is at or after the moment it was completed.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager.caching import invalidate_task_list_categories
+from task_manager.changes import task_lists_changed
+from task_manager.events import publish_task_events
+from task_manager.models import ArchivedTask, Task
+from task_manager.purge import delete_tasks
+
+# Columns copied as they are between the two tables.
+COPIED_FIELDS = ('id', 'title', 'description', 'deadline', 'priority', 'task_list_id', 'completed', 'category_id')
+
+
+def archivable_tasks(older_than_days, now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    # Deleted lists are left to their purge job.
+    return Task.objects.filter(completed=True, updated_at__lt=cutoff, task_list__deleted_at__isnull=True)
+
+
+def archive_completed_tasks(older_than_days, task_lists=None, batch_size=1000):
+    """
+    Move the tasks completed more than `older_than_days` days ago, with their assignees, to the archive.
+
+    Each batch of `batch_size` tasks is moved in its own transaction, so the locks are held briefly and an
+    interrupted run keeps what it archived. Returns the number of tasks archived.
+    """
+    tasks = archivable_tasks(older_than_days)
+    if task_lists is not None:
+        tasks = tasks.filter(task_list__in=task_lists)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            task_ids = list(tasks.select_for_update().order_by('id').values_list('id', flat=True)[:batch_size])
+            if not task_ids:
+                return archived
+            archived += archive_tasks(Task.objects.filter(id__in=task_ids))
+
+
+def archive_tasks(tasks):
+    """Move the `tasks` queryset to the archive; call inside a transaction holding locks on its rows."""
+    rows = list(tasks.values(*COPIED_FIELDS, 'updated_at'))
+    if not rows:
+        return 0
+    task_ids = [row['id'] for row in rows]
+    ArchivedTask.objects.bulk_create([ArchivedTask(**row) for row in rows])
+    assignees = Task.assigned_to.through.objects.filter(task_id__in=task_ids).values_list('task_id', 'user_id')
+    ArchivedTask.assigned_to.through.objects.bulk_create([
+        ArchivedTask.assigned_to.through(archivedtask_id=task_id, user_id=user_id) for task_id, user_id in assignees
+    ])
+    delete_tasks(task_ids)
+    _record_changes(rows, sign=-1, event_type='deleted')
+    return len(rows)
+
+
+def restore_archived_tasks(archived_tasks):
+    """
+    Move the `archived_tasks` queryset back to the Task table, with their assignees and category.
+
+    Tasks keep their id, and their updated_at is the time of the restore so they are not archived again
+    straight away. Returns the number of tasks restored.
+    """
+    with transaction.atomic():
+        rows = list(archived_tasks.select_for_update().values(*COPIED_FIELDS))
+        if not rows:
+            return 0
+        task_ids = [row['id'] for row in rows]
+        Task.objects.bulk_create([Task(**row) for row in rows])
+        assignees = ArchivedTask.assigned_to.through.objects.filter(
+            archivedtask_id__in=task_ids,
+        ).values_list('archivedtask_id', 'user_id')
+        Task.assigned_to.through.objects.bulk_create([
+            Task.assigned_to.through(task_id=task_id, user_id=user_id) for task_id, user_id in assignees
+        ])
+        ArchivedTask.objects.filter(id__in=task_ids).delete()
+        _record_changes(rows, sign=1, event_type='created')
+    return len(rows)
+
+
+def _record_changes(rows, sign, event_type):
+    # bulk_create() and queryset deletes leave the counters and caches to the caller.
+    count_deltas = defaultdict(lambda: [0, 0])
+    events = defaultdict(list)
+    for row in rows:
+        count_deltas[row['task_list_id']][0] += sign
+        count_deltas[row['task_list_id']][1] += sign * row['completed']
+        events[row['task_list_id']].append({'type': event_type, 'id': row['id']})
+    task_lists_changed(count_deltas.keys(), count_deltas)
+    invalidate_task_list_categories(count_deltas.keys())
+    for task_list_id, task_events in events.items():
+        publish_task_events(task_list_id, task_events)
@@ -0,0 +1,133 @@
+"""
+Async versions of the read-heavy views, used when settings.ASYNC_READ_VIEWS is set (ASGI deployments).
+
+They reuse the synchronous views' querysets, cache keys and templates, and only swap the data loading for
+the async ORM and cache API, so a request waiting on the database does not hold a thread.
+
+TaskListEventsView has no sync counterpart: it keeps its connection open and is only served over ASGI.
+"""
+import asyncio
+import json
+from inspect import isawaitable
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.views import View
+
+from task_manager.caching import aget_accessible_task_list_ids, aget_or_render_fragment, aget_task_list_members, \
+    aget_task_list_version, aget_task_list_versions, aget_visible_categories
+from task_manager.events import get_broker, task_list_channel
+from task_manager.models import TaskList
+from task_manager.views import CalendarEventsView, TaskListAccessMixin, TaskListDetailView, TaskListView
+
+
+class AsyncLoginRequiredMixin:
+    async def dispatch(self, request, *args, **kwargs):
+        # request.user would load the session synchronously; once it is resolved here, the sync mixins
+        # further down the MRO only read cached values.
+        request.user = await request.auser()
+        if request.user.is_authenticated:
+            await self.aprepare()
+        response = super().dispatch(request, *args, **kwargs)
+        return await response if isawaitable(response) else response
+
+    async def aprepare(self):
+        pass
+
+
+class AsyncTaskListAccessMixin(AsyncLoginRequiredMixin):
+    async def aprepare(self):
+        # Fills the cache TaskListAccessMixin.get_task_list() reads.
+        task_list_id = self.kwargs.get('task_list_id') or self.kwargs.get('pk')
+        if task_list_id not in await aget_accessible_task_list_ids(self.request.user):
+            raise Http404('No TaskList matches the given query.')
+        self._task_list = await aget_object_or_404(TaskList, pk=task_list_id)
+
+
+class AsyncTaskListView(AsyncLoginRequiredMixin, TaskListView):
+    async def get(self, request, *args, **kwargs):
+        task_list_ids, latest = await self.aget_task_lists_state()
+        return await self.aconditional_response(
+            *self.get_validators(task_list_ids, latest), lambda: self.arender_page(task_list_ids),
+        )
+
+    async def arender_page(self, task_list_ids):
+        self.object_list = self.get_queryset()
+        key = self.get_rows_cache_key(await aget_task_list_versions(task_list_ids))
+        rows = await aget_or_render_fragment(key, self.arender_rows)
+        return self.render_to_response(self.get_context_data(task_list_rows=rows))
+
+    async def arender_rows(self):
+        return self.render_rows([task_list async for task_list in self.object_list])
+
+
+class AsyncTaskListDetailView(AsyncTaskListAccessMixin, TaskListDetailView):
+    async def get(self, request, *args, **kwargs):
+        task_list_ids, latest = await self.aget_task_lists_state()
+        return await self.aconditional_response(
+            self.get_page_etag_parts(task_list_ids, latest), latest, self.arender_page,
+        )
+
+    async def arender_page(self):
+        self.object = self.get_object()
+        return self.render_to_response(self.get_context_data(object=self.object, **await self.aget_page_data()))
+
+    async def aget_page_data(self):
+        version = await aget_task_list_version(self.object.pk)
+        return {
+            'categories': await aget_visible_categories(self.request.user, [self.object.pk]),
+            'rows': await aget_or_render_fragment(self.get_rows_cache_key(version), self.arender_rows),
+            'users': await aget_task_list_members(self.object),
+            'accessible_task_list_ids': await aget_accessible_task_list_ids(self.request.user),
+        }
+
+    async def arender_rows(self):
+        return self.rows_fragment(await self.get_paginator(self.get_tasks()).aget_page(self.request.GET.get('cursor')))
+
+
+class AsyncCalendarEventsView(AsyncLoginRequiredMixin, CalendarEventsView):
+    async def get(self, request, *args, **kwargs):
+        start, end = self.get_bounds()
+        if start is None:
+            return self.invalid_bounds()
+        tasks = self.get_queryset(start, end)
+        state = await tasks.aaggregate(**self.state_aggregates)
+        return await self.aconditional_response(
+            *self.get_validators(start, end, state), lambda: self.arender_events(tasks),
+        )
+
+    async def arender_events(self, tasks):
+        return self.render_events([task async for task in tasks])
+
+
+class TaskListEventsView(AsyncTaskListAccessMixin, TaskListAccessMixin, View):
+    """Stream the task change events of a task list (see task_manager.events) as server-sent events."""
+    query_budget = 4
+    # Seconds between comments that keep proxies from closing an idle stream.
+    heartbeat = 15
+    # Streams end after this many seconds and the browser reconnects, so access is checked again regularly.
+    max_duration = 300
+    retry_ms = 3000
+
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            # A WSGI worker would be tied up for the whole stream; 204 tells EventSource not to reconnect.
+            return HttpResponse(status=204)
+        response = StreamingHttpResponse(self.stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_duration
+        async with get_broker().subscribe(task_list_channel(self.task_list.pk)) as subscription:
+            yield f'retry: {self.retry_ms}\n\n'
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), min(self.heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
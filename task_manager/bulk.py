@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from task_manager.caching import invalidate_task_list_categories
+from task_manager.changes import task_lists_changed
+from task_manager.events import publish_task_events
+from task_manager.models import Task
+from task_manager.purge import delete_tasks
+
+
+def apply_bulk_action(tasks, action, priority=None, category=None, assigned_to=(), target_task_list=None):
+    """
+    Apply `action` to every task of the `tasks` queryset with set-based statements.
+
+    Returns the number of tasks affected.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # update() and bulk_create() send no signals and skip auto_now, so the changes are recorded here.
+        # Locking the selected rows keeps the counter deltas in step with what the statements below change.
+        selected = list(tasks.select_for_update().values_list('id', 'task_list_id', 'completed'))
+        task_list_ids = {task_list_id for _, task_list_id, _ in selected}
+        if action == 'move':
+            task_list_ids.add(target_task_list.pk)
+        task_lists_changed(task_list_ids, _count_deltas(selected, action, target_task_list))
+        for task_list_id, events in _events(selected, action, priority, target_task_list).items():
+            publish_task_events(task_list_id, events)
+        if action in ('set_category', 'move', 'delete'):
+            invalidate_task_list_categories(task_list_ids)
+        if action == 'complete':
+            return tasks.update(completed=True, updated_at=now)
+        if action == 'uncomplete':
+            return tasks.update(completed=False, updated_at=now)
+        if action == 'set_priority':
+            return tasks.update(priority=priority, updated_at=now)
+        if action == 'set_category':
+            return tasks.update(category=category, updated_at=now)
+        if action == 'move':
+            return tasks.update(task_list=target_task_list, updated_at=now)
+        if action == 'delete':
+            # The changes are recorded above; the queryset delete loads only the ids of the rows.
+            return delete_tasks([task_id for task_id, _, _ in selected])
+        if action == 'assign':
+            task_ids = [task_id for task_id, _, _ in selected]
+            through = Task.assigned_to.through
+            through.objects.bulk_create(
+                [through(task_id=task_id, user_id=user.id) for task_id in task_ids for user in assigned_to],
+                ignore_conflicts=True,
+            )
+            Task.objects.filter(id__in=task_ids).update(updated_at=now)
+            return len(task_ids)
+    raise ValueError(f'Unknown bulk action: {action}')
+
+
+def toggle_completed(task_list, task_id):
+    """
+    Flip the completion of a task of `task_list` with a single UPDATE.
+
+    Returns the new state, or None when the list has no such task.
+    """
+    with transaction.atomic(savepoint=False):
+        updated = Task.objects.filter(id=task_id, task_list=task_list).update(
+            completed=~F('completed'), updated_at=timezone.now(),
+        )
+        if not updated:
+            return None
+        # The UPDATE keeps the row locked until the commit, so this reads the state it wrote.
+        completed = Task.objects.filter(id=task_id).values_list('completed', flat=True).get()
+        task_lists_changed([task_list.pk], {task_list.pk: (0, 1 if completed else -1)})
+        publish_task_events(task_list.pk, [{'type': 'completed', 'id': task_id, 'completed': completed}])
+    return completed
+
+
+def _count_deltas(selected, action, target_task_list=None):
+    """Return the task counter increments of each list for applying `action` to the (id, list id, completed) rows."""
+    deltas = defaultdict(lambda: [0, 0])
+    for _, task_list_id, completed in selected:
+        if action == 'complete' and not completed:
+            deltas[task_list_id][1] += 1
+        elif action == 'uncomplete' and completed:
+            deltas[task_list_id][1] -= 1
+        elif action == 'delete' or (action == 'move' and task_list_id != target_task_list.pk):
+            deltas[task_list_id][0] -= 1
+            deltas[task_list_id][1] -= completed
+            if action == 'move':
+                deltas[target_task_list.pk][0] += 1
+                deltas[target_task_list.pk][1] += completed
+    return deltas
+
+
+def _events(selected, action, priority=None, target_task_list=None):
+    """Return the task change events of each list for applying `action` to the (id, list id, completed) rows."""
+    events = defaultdict(list)
+    for task_id, task_list_id, completed in selected:
+        if action in ('complete', 'uncomplete'):
+            if completed != (action == 'complete'):
+                events[task_list_id].append({'type': 'completed', 'id': task_id, 'completed': action == 'complete'})
+        elif action == 'delete' or (action == 'move' and task_list_id != target_task_list.pk):
+            events[task_list_id].append({'type': 'deleted', 'id': task_id})
+            if action == 'move':
+                events[target_task_list.pk].append({'type': 'created', 'id': task_id})
+        elif action == 'set_priority':
+            events[task_list_id].append({'type': 'updated', 'id': task_id, 'priority': priority})
+        elif action in ('set_category', 'assign'):
+            events[task_list_id].append({'type': 'updated', 'id': task_id})
+    return events
@@ -0,0 +1,257 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import Q
+
+from task_manager.models import CachedUser, Category, Task, TaskList
+from task_manager.routers import cache_timeout
+
+ACCESSIBLE_LISTS_TIMEOUT = 300
+TASK_LIST_CATEGORIES_TIMEOUT = 300
+USER_TIMEOUT = 300
+
+
+def accessible_task_lists_key(user_id):
+    return f'task_manager:accessible_task_lists:{user_id}'
+
+
+def _accessible_task_list_ids_query(user):
+    return TaskList.objects.filter(
+        Q(created_by=user) | Q(id__in=user.shared_task_lists.values('id')), deleted_at__isnull=True,
+    ).values_list('id', flat=True)
+
+
+def get_accessible_task_list_ids(user):
+    """Return the ids of the task lists `user` owns or that are shared with them."""
+    key = accessible_task_lists_key(user.pk)
+    task_list_ids = cache.get(key)
+    if task_list_ids is None:
+        task_list_ids = frozenset(_accessible_task_list_ids_query(user))
+        cache.set(key, task_list_ids, cache_timeout(ACCESSIBLE_LISTS_TIMEOUT))
+    return task_list_ids
+
+
+async def aget_accessible_task_list_ids(user):
+    key = accessible_task_lists_key(user.pk)
+    task_list_ids = await cache.aget(key)
+    if task_list_ids is None:
+        task_list_ids = frozenset([task_list_id async for task_list_id in _accessible_task_list_ids_query(user)])
+        await cache.aset(key, task_list_ids, cache_timeout(ACCESSIBLE_LISTS_TIMEOUT))
+    return task_list_ids
+
+
+def _on_change(func, *args):
+    """
+    Run `func` now and, inside a transaction, once more after it commits.
+
+    A request reading between the two calls may cache data that predates the commit; the second call
+    throws that entry away.
+    """
+    func(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: func(*args))
+
+
+def invalidate_accessible_task_lists(user_ids):
+    _on_change(cache.delete_many, [accessible_task_lists_key(user_id) for user_id in user_ids])
+
+
+def user_key(user_id):
+    return f'task_manager:user:{user_id}'
+
+
+def get_cached_user(user_id):
+    """
+    Return the User with this id, or None; the authentication classes load the request user through here.
+
+    The password hash is not cached: see CachedUser.
+    """
+    key = user_key(user_id)
+    data = cache.get(key)
+    if data is not None:
+        return CachedUser.from_cache_data(data, router.db_for_read(CachedUser))
+    user = CachedUser.objects.filter(pk=user_id).first()
+    if user is not None:
+        cache.set(key, user.get_cache_data(), USER_TIMEOUT)
+    return user
+
+
+def invalidate_users(user_ids):
+    # Saving a user is enough: a password change drops the cached session auth hash derived from the old one.
+    _on_change(cache.delete_many, [user_key(user_id) for user_id in user_ids])
+
+
+def task_list_members_key(task_list_id):
+    return f'task_manager:task_list_members:{task_list_id}'
+
+
+def get_task_list_member_ids(task_list):
+    """Return the ids of the owner of `task_list` and of the users it is shared with."""
+    key = task_list_members_key(task_list.pk)
+    member_ids = cache.get(key)
+    if member_ids is None:
+        member_ids = frozenset([task_list.created_by_id, *task_list.shared_with.values_list('id', flat=True)])
+        cache.set(key, member_ids, cache_timeout(ACCESSIBLE_LISTS_TIMEOUT))
+    return member_ids
+
+
+async def aget_task_list_member_ids(task_list):
+    key = task_list_members_key(task_list.pk)
+    member_ids = await cache.aget(key)
+    if member_ids is None:
+        shared_with_ids = [user_id async for user_id in task_list.shared_with.values_list('id', flat=True)]
+        member_ids = frozenset([task_list.created_by_id, *shared_with_ids])
+        await cache.aset(key, member_ids, cache_timeout(ACCESSIBLE_LISTS_TIMEOUT))
+    return member_ids
+
+
+def get_task_list_members(task_list):
+    return User.objects.filter(id__in=get_task_list_member_ids(task_list)).order_by('username')
+
+
+async def aget_task_list_members(task_list):
+    return User.objects.filter(id__in=await aget_task_list_member_ids(task_list)).order_by('username')
+
+
+def invalidate_task_list_members(task_list_ids):
+    _on_change(cache.delete_many, [task_list_members_key(task_list_id) for task_list_id in task_list_ids])
+
+
+def task_list_categories_key(task_list_id):
+    return f'task_manager:task_list_categories:{task_list_id}'
+
+
+def _task_list_category_ids_query(task_list_ids):
+    return Task.objects.filter(
+        task_list_id__in=task_list_ids, category__isnull=False,
+    ).values_list('task_list_id', 'category_id').distinct()
+
+
+def _group_category_ids(task_list_ids, rows):
+    category_ids = {task_list_id: set() for task_list_id in task_list_ids}
+    for task_list_id, category_id in rows:
+        category_ids[task_list_id].add(category_id)
+    return {task_list_categories_key(task_list_id): frozenset(ids) for task_list_id, ids in category_ids.items()}
+
+
+def get_task_list_category_ids(task_list_ids):
+    """Return the ids of the categories used by the tasks of these lists, with one cache round trip."""
+    keys = {task_list_categories_key(task_list_id): task_list_id for task_list_id in task_list_ids}
+    cached = cache.get_many(keys)
+    missing = [task_list_id for key, task_list_id in keys.items() if key not in cached]
+    if missing:
+        found = _group_category_ids(missing, _task_list_category_ids_query(missing))
+        cache.set_many(found, cache_timeout(TASK_LIST_CATEGORIES_TIMEOUT))
+        cached.update(found)
+    return frozenset().union(*cached.values())
+
+
+async def aget_task_list_category_ids(task_list_ids):
+    keys = {task_list_categories_key(task_list_id): task_list_id for task_list_id in task_list_ids}
+    cached = await cache.aget_many(keys)
+    missing = [task_list_id for key, task_list_id in keys.items() if key not in cached]
+    if missing:
+        found = _group_category_ids(missing, [row async for row in _task_list_category_ids_query(missing)])
+        await cache.aset_many(found, cache_timeout(TASK_LIST_CATEGORIES_TIMEOUT))
+        cached.update(found)
+    return frozenset().union(*cached.values())
+
+
+def visible_categories(user, category_ids):
+    return Category.objects.filter(Q(created_by=user) | Q(id__in=category_ids))
+
+
+def get_visible_categories(user, task_list_ids):
+    """
+    The categories `user` can pick or filter by in these task lists: their own and the ones the lists' tasks use.
+
+    Evaluating it is a single query once the lists' category ids are cached.
+    """
+    return visible_categories(user, get_task_list_category_ids(task_list_ids))
+
+
+async def aget_visible_categories(user, task_list_ids):
+    return visible_categories(user, await aget_task_list_category_ids(task_list_ids))
+
+
+def invalidate_task_list_categories(task_list_ids):
+    keys = [task_list_categories_key(task_list_id) for task_list_id in task_list_ids if task_list_id is not None]
+    _on_change(cache.delete_many, keys)
+
+
+def task_list_version_key(task_list_id):
+    return f'task_manager:task_list_version:{task_list_id}'
+
+
+def _new_version():
+    # Random rather than a counter, so a version lost to eviction never comes back as a value an old
+    # fragment is still stored under.
+    return uuid.uuid4().hex
+
+
+def get_task_list_versions(task_list_ids):
+    """Return {task list id: version}, with a single cache round trip."""
+    keys = {task_list_version_key(task_list_id): task_list_id for task_list_id in task_list_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    missing = {key: _new_version() for key, task_list_id in keys.items() if task_list_id not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+async def aget_task_list_versions(task_list_ids):
+    keys = {task_list_version_key(task_list_id): task_list_id for task_list_id in task_list_ids}
+    versions = {keys[key]: version for key, version in (await cache.aget_many(keys)).items()}
+    missing = {key: _new_version() for key, task_list_id in keys.items() if task_list_id not in versions}
+    if missing:
+        await cache.aset_many(missing, None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def get_task_list_version(task_list_id):
+    return get_task_list_versions([task_list_id])[task_list_id]
+
+
+async def aget_task_list_version(task_list_id):
+    return (await aget_task_list_versions([task_list_id]))[task_list_id]
+
+
+def _bump_versions(task_list_ids):
+    version = _new_version()
+    cache.set_many({task_list_version_key(task_list_id): version for task_list_id in task_list_ids}, None)
+
+
+def bump_task_list_versions(task_list_ids):
+    """Mark everything rendered from these task lists as stale."""
+    task_list_ids = {task_list_id for task_list_id in task_list_ids if task_list_id is not None}
+    if task_list_ids:
+        _on_change(_bump_versions, task_list_ids)
+
+
+def fragment_cache_key(name, *parts):
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'task_manager:fragment:{name}:{digest}'
+
+
+def get_or_render_fragment(key, render):
+    """Return the fragment cached under `key`, calling `render()` to build and store it on a miss."""
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = render()
+        cache.set(key, fragment, cache_timeout(settings.FRAGMENT_CACHE_TIMEOUT))
+    return fragment
+
+
+async def aget_or_render_fragment(key, render):
+    """Like get_or_render_fragment(), with `render` a coroutine function."""
+    fragment = await cache.aget(key)
+    if fragment is None:
+        fragment = await render()
+        await cache.aset(key, fragment, cache_timeout(settings.FRAGMENT_CACHE_TIMEOUT))
+    return fragment
@@ -0,0 +1,57 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from task_manager.caching import bump_task_list_versions
+from task_manager.models import Task, TaskList
+
+
+def task_lists_changed(task_list_ids, count_deltas=None):
+    """
+    Move updated_at of these task lists forward and drop what was cached from them.
+
+    `count_deltas` maps task list ids to (total, completed) increments applied to the task counters in the
+    same UPDATE.
+    """
+    count_deltas = {
+        task_list_id: deltas for task_list_id, deltas in (count_deltas or {}).items() if any(deltas)
+    }
+    task_list_ids = {task_list_id for task_list_id in [*task_list_ids, *count_deltas] if task_list_id is not None}
+    if not task_list_ids:
+        return
+    now = timezone.now()
+    for task_list_id, (total, completed) in count_deltas.items():
+        TaskList.objects.filter(id=task_list_id).update(
+            total_tasks=F('total_tasks') + total, completed_tasks=F('completed_tasks') + completed, updated_at=now,
+        )
+    if task_list_ids - count_deltas.keys():
+        TaskList.objects.filter(id__in=task_list_ids - count_deltas.keys()).update(updated_at=now)
+    bump_task_list_versions(task_list_ids)
+
+
+def tasks_changed(task_ids, task_list_ids):
+    """For changes that bypass Task.save(), such as updates to the assignees."""
+    Task.objects.filter(id__in=task_ids).update(updated_at=timezone.now())
+    task_lists_changed(task_list_ids)
+
+
+def task_count_subquery(**filters):
+    """Number of tasks of the outer task list matching `filters`, as an expression."""
+    tasks = Task.objects.filter(task_list=OuterRef('pk'), **filters).order_by().values('task_list')
+    return Coalesce(Subquery(tasks.annotate(count=Count('id')).values('count')), 0)
+
+
+def recount_task_lists(queryset=None):
+    """Recompute the task counters of `queryset` from the tasks table; returns the number that had drifted."""
+    queryset = TaskList.objects.all() if queryset is None else queryset
+    drifted = list(queryset.annotate(
+        actual_total=task_count_subquery(), actual_completed=task_count_subquery(completed=True),
+    ).exclude(
+        total_tasks=F('actual_total'), completed_tasks=F('actual_completed'),
+    ).values_list('id', flat=True))
+    if drifted:
+        TaskList.objects.filter(id__in=drifted).update(
+            total_tasks=task_count_subquery(), completed_tasks=task_count_subquery(completed=True),
+        )
+        bump_task_list_versions(drifted)
+    return len(drifted)
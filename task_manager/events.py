@@ -0,0 +1,138 @@
+"""
+Live task change events, streamed to the open pages of a task list (see async_views.TaskListEventsView).
+
+Events are small dicts such as {'type': 'completed', 'id': 12, 'completed': True}, published on the channel of
+their task list once the transaction that made the change commits. The broker fanning them out to subscribers
+is settings.TASK_EVENTS_BROKER.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+EVENT_TYPES = ('created', 'updated', 'completed', 'deleted')
+
+
+class Subscription:
+    """The events of one channel, in publication order, for a single consumer running on an event loop."""
+
+    def __init__(self, broker, channel, max_pending=100):
+        self.broker = broker
+        self.channel = channel
+        self.max_pending = max_pending
+        self._loop = None
+        self._queue = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self.broker.add_subscription(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.remove_subscription(self)
+
+    def put(self, event):
+        """Queue `event` for the consumer; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            # The consumer's loop is closed; it is about to unsubscribe.
+            pass
+
+    def _deliver(self, event):
+        if self._queue.qsize() >= self.max_pending:
+            # The consumer fell too far behind for the deltas to be worth applying.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event = {'type': 'reload'}
+        self._queue.put_nowait(event)
+
+    async def get(self):
+        return await self._queue.get()
+
+
+class InMemoryBroker:
+    """
+    Fan events out to the subscribers of the current process.
+
+    A broker implements publish(channel, event), callable from any thread, and subscribe(channel), which returns
+    an async context manager whose get() waits for the next event. Events only reach subscribers of the process
+    that published them, so deployments running several server processes need a broker backed by a shared
+    service (such as Redis pub/sub) implementing the same two methods.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, channel):
+        return Subscription(self, channel)
+
+    def add_subscription(self, subscription):
+        with self._lock:
+            self._subscriptions[subscription.channel].add(subscription)
+
+    def remove_subscription(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.channel, None)
+
+
+@cache
+def get_broker():
+    return import_string(settings.TASK_EVENTS_BROKER)()
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    if setting == 'TASK_EVENTS_BROKER':
+        get_broker.cache_clear()
+
+
+def task_list_channel(task_list_id):
+    return f'task_list.{task_list_id}'
+
+
+def publish_task_events(task_list_id, events):
+    """Publish `events` on the channel of `task_list_id` once the current transaction commits."""
+    events = list(events)
+    if task_list_id is None or not events:
+        return
+
+    def publish():
+        broker = get_broker()
+        for event in events:
+            broker.publish(task_list_channel(task_list_id), event)
+
+    transaction.on_commit(publish)
+
+
+def task_event(event_type, task):
+    """A compact event for a task instance; row details such as assignees are left to a reload."""
+    if event_type == 'deleted':
+        return {'type': event_type, 'id': task.pk}
+    if event_type == 'completed':
+        return {'type': event_type, 'id': task.pk, 'completed': task.completed}
+    return {
+        'type': event_type,
+        'id': task.pk,
+        'title': task.title,
+        'priority': task.priority,
+        'deadline': task.deadline.isoformat() if task.deadline else None,
+        'completed': task.completed,
+    }
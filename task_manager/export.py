@@ -0,0 +1,61 @@
+import csv
+import json
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+EXPORT_FIELDS = ['id', 'task_list', 'title', 'description', 'deadline', 'priority', 'completed', 'category',
+                 'assigned_to']
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the value back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(tasks):
+    # iterator(chunk_size=...) runs the assigned_to prefetch once per chunk rather than once per row,
+    # while category and task list titles come from the same row through the join.
+    return tasks.select_related('task_list', 'category').only(
+        'id', 'title', 'description', 'deadline', 'priority', 'completed', 'task_list__title', 'category__name',
+    ).prefetch_related(
+        Prefetch('assigned_to', queryset=User.objects.only('id', 'username'))
+    ).order_by('task_list_id', 'id')
+
+
+def iter_task_rows(tasks, chunk_size=EXPORT_CHUNK_SIZE):
+    for task in export_queryset(tasks).iterator(chunk_size=chunk_size):
+        yield {
+            'id': task.id,
+            'task_list': task.task_list.title,
+            'title': task.title,
+            'description': task.description or '',
+            'deadline': task.deadline.isoformat() if task.deadline else '',
+            'priority': task.priority,
+            'completed': task.completed,
+            'category': task.category.name if task.category else '',
+            'assigned_to': [user.username for user in task.assigned_to.all()],
+        }
+
+
+def stream_csv(tasks, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iter_task_rows(tasks, chunk_size):
+        row['assigned_to'] = ', '.join(row['assigned_to'])
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def stream_ndjson(tasks, chunk_size=EXPORT_CHUNK_SIZE):
+    for row in iter_task_rows(tasks, chunk_size):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson', 'ndjson'),
+}
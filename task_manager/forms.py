@@ -1,8 +1,12 @@
+import re
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from django.contrib.auth.models import User
-from django.db.models import Q
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 
+from .caching import get_task_list_members
 from .models import TaskList, Task, Category
 
 
@@ -41,13 +45,79 @@ class TaskForm(forms.ModelForm):
         super(TaskForm, self).__init__(*args, **kwargs)
 
         if task_list:
-            self.fields['assigned_to'].queryset = User.objects.filter(
-                Q(id=task_list.created_by.id) | Q(shared_task_lists=task_list)
-            ).distinct()
+            self.fields['assigned_to'].queryset = get_task_list_members(task_list)
+
+        if user_categories is not None:
+            self.fields['category'].queryset = user_categories
+
+
+class TaskImportForm(TaskForm):
+    """Validates one imported row with the TaskForm rules; assignees and category are resolved per batch."""
+    deadline = forms.DateTimeField(required=False)
+
+    class Meta(TaskForm.Meta):
+        fields = ['title', 'description', 'deadline', 'priority', 'completed']
+
+
+class TaskImportUploadForm(forms.Form):
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={'class': 'form-control',
+                                                                  'accept': '.csv,.json,.ndjson'}))
+    dry_run = forms.BooleanField(required=False, label='Dry run (validate without saving)',
+                                 widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+
 
+class BulkTaskActionForm(forms.Form):
+    ACTION_CHOICES = [
+        ('complete', 'Mark as complete'),
+        ('uncomplete', 'Mark as incomplete'),
+        ('delete', 'Delete'),
+        ('set_priority', 'Set priority'),
+        ('set_category', 'Set category'),
+        ('assign', 'Assign to'),
+        ('move', 'Move to list'),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+    tasks = forms.ModelMultipleChoiceField(queryset=Task.objects.none(), widget=forms.MultipleHiddenInput)
+    priority = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Priority'), ('High', 'High'), ('Medium', 'Medium'), ('Low', 'Low')],
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    category = forms.ModelChoiceField(queryset=Category.objects.none(), required=False, empty_label='No category',
+                                      widget=forms.Select(attrs={'class': 'form-select'}))
+    assigned_to = forms.ModelMultipleChoiceField(queryset=User.objects.none(), required=False,
+                                                 widget=forms.SelectMultiple(attrs={'class': 'form-select'}))
+    target_task_list = forms.ModelChoiceField(queryset=TaskList.objects.none(), required=False,
+                                              empty_label='Target list',
+                                              widget=forms.Select(attrs={'class': 'form-select'}))
+
+    def __init__(self, *args, **kwargs):
+        task_list = kwargs.pop('task_list')
+        user_categories = kwargs.pop('user_categories', None)
+        accessible_task_list_ids = kwargs.pop('accessible_task_list_ids', ())
+        super().__init__(*args, **kwargs)
+
+        self.task_list = task_list
+        self.fields['tasks'].queryset = task_list.tasks.all()
+        self.fields['assigned_to'].queryset = get_task_list_members(task_list)
+        self.fields['target_task_list'].queryset = TaskList.objects.filter(
+            id__in=accessible_task_list_ids
+        ).exclude(pk=task_list.pk)
         if user_categories is not None:
             self.fields['category'].queryset = user_categories
 
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        if action == 'set_priority' and not cleaned_data.get('priority'):
+            self.add_error('priority', 'Choose the priority to set.')
+        elif action == 'assign' and not cleaned_data.get('assigned_to'):
+            self.add_error('assigned_to', 'Choose at least one user to assign.')
+        elif action == 'move' and not cleaned_data.get('target_task_list'):
+            self.add_error('target_task_list', 'Choose the list to move the tasks to.')
+        return cleaned_data
+
 
 class UserRegistrationForm(UserCreationForm):
     username = forms.CharField(widget=forms.TextInput(attrs={'class': 'form-control'}))
@@ -72,7 +142,41 @@ class UserLoginForm(AuthenticationForm):
 
 
 class ShareTaskListForm(forms.Form):
-    email = forms.EmailField(widget=forms.EmailInput(attrs={'class': 'form-control'}))
+    emails = forms.CharField(required=False, label='User emails',
+                             help_text='Separate the addresses with commas, spaces or line breaks.',
+                             widget=forms.Textarea(attrs={'rows': 4, 'class': 'form-control'}))
+    group = forms.ModelChoiceField(queryset=Group.objects.none(), required=False, empty_label='No group',
+                                   help_text='Also share with every member of one of your groups.',
+                                   widget=forms.Select(attrs={'class': 'form-select'}))
+    max_recipients = 1000
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            self.fields['group'].queryset = user.groups.all()
+
+    def clean_emails(self):
+        emails = list(dict.fromkeys(
+            User.objects.normalize_email(email) for email in re.split(r'[\s,;]+', self.cleaned_data['emails']) if email
+        ))
+        invalid = []
+        for email in emails:
+            try:
+                validate_email(email)
+            except ValidationError:
+                invalid.append(email)
+        if invalid:
+            raise ValidationError(f"Not valid email addresses: {', '.join(invalid)}.")
+        if len(emails) > self.max_recipients:
+            raise ValidationError(f'Share with at most {self.max_recipients} addresses at once.')
+        return emails
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors and not cleaned_data.get('emails') and not cleaned_data.get('group'):
+            raise ValidationError('Enter at least one email address or choose a group.')
+        return cleaned_data
 
 
 class CategoryForm(forms.ModelForm):
@@ -0,0 +1,163 @@
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from task_manager.caching import get_task_list_members, get_visible_categories, invalidate_task_list_categories
+from task_manager.changes import task_lists_changed
+from task_manager.events import publish_task_events, task_event
+from task_manager.forms import TaskImportForm
+from task_manager.models import Task
+
+IMPORT_BATCH_SIZE = 1000
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    rejected: list = field(default_factory=list)
+    dry_run: bool = False
+
+    def reject(self, line, errors):
+        self.rejected.append((line, errors))
+
+
+@dataclass
+class UnreadableRow:
+    """Stands for a line read_rows() could not parse, which import_tasks() rejects like an invalid row."""
+    error: str
+
+
+def read_rows(stream, file_format):
+    """
+    Yield (line number, row) pairs from a CSV, JSON array or NDJSON text stream.
+
+    JSON rows are yielded whatever their type, and unparsable NDJSON lines as UnreadableRow: import_tasks()
+    rejects the rows that are not objects. Errors that leave the rest of the stream unreadable are raised.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'json':
+        rows = json.load(stream)
+        if not isinstance(rows, list):
+            raise ValueError('A JSON import must be an array of tasks.')
+        for index, row in enumerate(rows, start=1):
+            yield index, row
+    elif file_format == 'ndjson':
+        for index, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield index, json.loads(line)
+                except json.JSONDecodeError as error:
+                    yield index, UnreadableRow(f'Invalid JSON: {error}')
+    else:
+        raise ValueError(f"Unsupported import format '{file_format}'.")
+
+
+def guess_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower()
+    return extension if extension in ('csv', 'json', 'ndjson') else 'csv'
+
+
+def split_names(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, list):
+        value = [value]
+    return [str(name).strip() for name in value if name and str(name).strip()]
+
+
+def import_tasks(task_list, user, rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Validate `rows` with the TaskForm rules and insert the valid ones into `task_list` with bulk_create.
+
+    Category names are resolved among the categories visible to `user` in that list (see
+    caching.get_visible_categories) with one query per batch; assignee usernames are checked against the list
+    members, loaded once.
+    """
+    report = ImportReport(dry_run=dry_run)
+    members = dict(get_task_list_members(task_list).values_list('username', 'id'))
+    rows = iter(rows)
+    batch, line, imported_batches, read_error = [], 0, 0, None
+    while True:
+        try:
+            row = next(rows, None)
+        except (ValueError, csv.Error) as error:
+            if not imported_batches:
+                # Nothing is saved yet: let the caller report the file as unreadable.
+                raise
+            # The previous batches are committed; import what was read and report where reading stopped.
+            row, read_error = None, error
+        if row is not None:
+            line = row[0]
+            batch.append(row)
+        if batch and (row is None or len(batch) == batch_size):
+            _import_batch(task_list, user, batch, members, report, dry_run)
+            batch = []
+            imported_batches += 1
+        if row is None:
+            if read_error is not None:
+                report.reject(line + 1, {'file': [f'Could not read the rest of the file: {read_error}']})
+            return report
+
+
+def _import_batch(task_list, user, batch, members, report, dry_run):
+    category_names = {str(row.get('category') or '').strip() for _, row in batch if isinstance(row, dict)} - {''}
+    categories = {}
+    if category_names:
+        visible = get_visible_categories(user, [task_list.pk]).filter(
+            name__in=category_names,
+        ).values_list('name', 'id', 'created_by_id')
+        # Prefer the user's own category when another one with the same name is used in the list.
+        for name, category_id, created_by_id in sorted(visible, key=lambda item: item[2] == user.id):
+            categories[name] = category_id
+
+    tasks, assignees = [], []
+    for line, row in batch:
+        if isinstance(row, UnreadableRow):
+            report.reject(line, {'row': [row.error]})
+            continue
+        if not isinstance(row, dict):
+            # JSON and NDJSON rows can be any value.
+            report.reject(line, {'row': ['Expected an object with the task fields.']})
+            continue
+        form = TaskImportForm(data=row)
+        errors = dict(form.errors) if not form.is_valid() else {}
+
+        category_name = str(row.get('category') or '').strip()
+        if category_name and category_name not in categories:
+            errors['category'] = [f"Unknown category '{category_name}'."]
+        usernames = split_names(row.get('assigned_to'))
+        unknown = [username for username in usernames if username not in members]
+        if unknown:
+            errors['assigned_to'] = [f"Not a member of this list: {', '.join(unknown)}."]
+
+        if errors:
+            report.reject(line, {name: [str(error) for error in messages] for name, messages in errors.items()})
+            continue
+        task = form.save(commit=False)
+        task.task_list = task_list
+        task.category_id = categories.get(category_name)
+        tasks.append(task)
+        assignees.append({members[username] for username in usernames})
+
+    if dry_run:
+        report.created += len(tasks)
+        return
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        through = Task.assigned_to.through
+        through.objects.bulk_create([
+            through(task_id=task.id, user_id=user_id)
+            for task, user_ids in zip(tasks, assignees) for user_id in user_ids
+        ])
+        task_lists_changed([task_list.pk], {task_list.pk: (len(tasks), sum(task.completed for task in tasks))})
+        if any(task.category_id for task in tasks):
+            invalidate_task_list_categories([task_list.pk])
+        publish_task_events(task_list.pk, [task_event('created', task) for task in tasks])
+    report.created += len(tasks)
@@ -0,0 +1,71 @@
+"""
+A small job queue kept in the database and worked through by the run_jobs management command.
+
+Jobs are created in the transaction of the change that needs them, so they exist if and only if that change
+committed. Handlers must be safe to run again: the job of a worker that died is picked up once its lease ends.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from task_manager.models import Job
+
+logger = logging.getLogger('task_manager.jobs')
+
+JOB_HANDLERS = {
+    'purge_task_list': 'task_manager.purge.purge_task_list',
+}
+LEASE = timedelta(minutes=10)
+RETRY_DELAY = timedelta(minutes=1)
+MAX_ATTEMPTS = 5
+
+
+def enqueue(kind, **payload):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def claim_job():
+    """Lease the next due job to this worker and return it, or None when no job is due."""
+    now = timezone.now()
+    with transaction.atomic():
+        # SKIP LOCKED lets several workers claim jobs side by side.
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            failed=False, run_after__lte=now,
+        ).order_by('run_after', 'id').first()
+        if job is None:
+            return None
+        job.attempts += 1
+        job.run_after = now + LEASE
+        job.save(update_fields=['attempts', 'run_after'])
+    return job
+
+
+def run_job(job):
+    """Run a claimed job; returns whether it succeeded. Failed jobs are retried with a growing delay."""
+    try:
+        import_string(JOB_HANDLERS[job.kind])(**job.payload)
+    except Exception as error:
+        logger.exception('Job %s failed (attempt %d)', job, job.attempts)
+        job.last_error = f'{type(error).__name__}: {error}'
+        job.failed = job.attempts >= MAX_ATTEMPTS
+        job.run_after = timezone.now() + RETRY_DELAY * 2 ** (job.attempts - 1)
+        job.save(update_fields=['last_error', 'failed', 'run_after'])
+        return False
+    job.delete()
+    return True
+
+
+def run_due_jobs():
+    """Run jobs until none is due; returns the numbers of jobs that succeeded and failed."""
+    succeeded = failed = 0
+    while (job := claim_job()) is not None:
+        if run_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.archive import archive_completed_tasks, restore_archived_tasks
+from task_manager.models import ArchivedTask, TaskList
+
+
+class Command(BaseCommand):
+    help = 'Move tasks completed more than --days days ago to the archive table, or restore archived tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task_list_ids', nargs='*', type=int, help='Lists to process (default: all of them).')
+        parser.add_argument('--days', type=int, default=90,
+                            help='Archive tasks completed and left unchanged for more than this many days.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of tasks moved per transaction.')
+        parser.add_argument('--restore', action='store_true',
+                            help='Move the archived tasks of the given lists back to their lists instead.')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--days must not be negative and --batch-size must be at least 1.')
+        task_lists = None
+        if options['task_list_ids']:
+            task_lists = TaskList.objects.filter(id__in=options['task_list_ids'])
+
+        if options['restore']:
+            if task_lists is None:
+                raise CommandError('Pass the ids of the task lists to restore.')
+            restored = restore_archived_tasks(ArchivedTask.objects.filter(task_list__in=task_lists))
+            self.stdout.write(self.style.SUCCESS(f'Restored {restored} task(s) from the archive.'))
+            return
+
+        archived = archive_completed_tasks(options['days'], task_lists=task_lists, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} task(s) completed more than {options['days']} day(s) ago."
+        ))
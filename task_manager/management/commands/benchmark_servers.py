@@ -0,0 +1,189 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from time import perf_counter
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager.management.commands.benchmark_views import Command as BenchmarkViewsCommand, percentile
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    # A redirect to the login page must count as an error, not as a fast successful request.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+opener = build_opener(NoRedirectHandler)
+
+SERVERS = {
+    # name: (command line, ASYNC_READ_VIEWS)
+    'wsgi': (['gunicorn', 'gestionnaire_taches_project.wsgi:application', '--worker-class', 'gthread'], False),
+    'asgi': (['uvicorn', 'gestionnaire_taches_project.asgi:application', '--no-access-log'], True),
+    'asgi-sync': (['uvicorn', 'gestionnaire_taches_project.asgi:application', '--no-access-log'], False),
+}
+
+
+class Command(BaseCommand):
+    help = ('Start the project under gunicorn (WSGI) and uvicorn (ASGI), fire concurrent requests at the read views '
+            'and report throughput and latency percentiles as JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=SERVERS, default=['wsgi', 'asgi'],
+                            help='asgi serves the async read views, asgi-sync the sync ones under uvicorn.')
+        parser.add_argument('--user', help='Username to benchmark as (default: owner of the largest task list).')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once.')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per scenario.')
+        parser.add_argument('--workers', type=int, default=1, help='Server worker processes.')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gunicorn worker.')
+        parser.add_argument('--startup-timeout', type=float, default=30)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be at least 1.')
+        if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] == ':memory:':
+            raise CommandError('The servers run in separate processes and cannot share an in-memory database.')
+
+        user, task_list = BenchmarkViewsCommand.get_subject(options['user'])
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+        results = {}
+        for name in options['servers']:
+            self.stderr.write(f'Benchmarking {name}...')
+            with self.run_server(name, options) as base_url:
+                results[name] = {
+                    scenario: self.run_scenario(base_url + path, cookie, options['requests'], options['concurrency'])
+                    for scenario, path in self.get_scenarios(task_list)
+                }
+
+        report = {
+            'meta': {
+                'user': user.username,
+                'task_list': task_list.pk,
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+                'workers': options['workers'],
+                'threads': options['threads'],
+                'database': connection.vendor,
+                'timestamp': timezone.now().isoformat(),
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def get_scenarios(task_list):
+        now = timezone.now()
+        calendar_params = {'start': now.isoformat(), 'end': (now + timedelta(days=35)).isoformat()}
+        yield 'task_lists', reverse('task_lists')
+        yield 'view_task_list', reverse('view_task_list', args=[task_list.pk])
+        yield 'calendar_events', f"{reverse('calendar_events')}?{urlencode(calendar_params)}"
+
+    @staticmethod
+    def get_free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def run_server(self, name, options):
+        command, async_read_views = SERVERS[name]
+        port = self.get_free_port()
+        command = [sys.executable, '-m', *command, '--workers', str(options['workers'])]
+        if name == 'wsgi':
+            command += ['--threads', str(options['threads']), '--bind', f'127.0.0.1:{port}']
+        else:
+            command += ['--host', '127.0.0.1', '--port', str(port)]
+        # The servers must accept the session signed here, even when SECRET_KEY is not set in the environment.
+        env = {**os.environ, 'SECRET_KEY': settings.SECRET_KEY, 'ASYNC_READ_VIEWS': str(async_read_views)}
+        return ServerProcess(command, env, port, options['startup_timeout'])
+
+    @staticmethod
+    def fetch(url, cookie):
+        request = Request(url, headers={'Cookie': cookie, 'Host': BenchmarkViewsCommand.get_host()})
+        start = perf_counter()
+        try:
+            with opener.open(request, timeout=60) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        except URLError:
+            status = None
+        return status, (perf_counter() - start) * 1000
+
+    def run_scenario(self, url, cookie, requests, concurrency):
+        self.fetch(url, cookie)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            start = perf_counter()
+            responses = list(executor.map(lambda _: self.fetch(url, cookie), range(requests)))
+            elapsed = perf_counter() - start
+        timings = [timing for _, timing in responses]
+        return {
+            'requests_per_second': round(requests / elapsed, 1),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'errors': sum(1 for status, _ in responses if status != 200),
+        }
+
+
+class ServerProcess:
+    def __init__(self, command, env, port, startup_timeout):
+        self.command = command
+        self.env = env
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.process = None
+        # A file rather than a pipe, so a chatty server cannot block on a full pipe mid-benchmark.
+        self.log = tempfile.TemporaryFile()
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.command, env=self.env, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=self.log,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                raise CommandError(f"'{' '.join(self.command)}' exited:\n{self.log.read().decode()}")
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1).close()
+                return f'http://127.0.0.1:{self.port}'
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise CommandError(f"'{' '.join(self.command)}' did not start listening within {self.startup_timeout}s.")
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
@@ -0,0 +1,168 @@
+import json
+import math
+from datetime import timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager.caching import get_accessible_task_list_ids
+from task_manager.models import TaskList
+from task_manager.pagination import KeysetPaginator
+from task_manager.views import TaskListDetailView
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Request the main views through the test client and report latency percentiles and query counts as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to benchmark as (default: owner of the largest task list).')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--include-writes', action='store_true',
+                            help='Also benchmark task create/update POSTs (rolled back after each request).')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--compare', help='Previous JSON report to print p50/p95 deltas against.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        user, task_list = self.get_subject(options['user'])
+        client = Client(HTTP_HOST=self.get_host())
+        client.force_login(user)
+
+        results = {}
+        for name, method, url, data in self.get_scenarios(user, task_list, options['include_writes']):
+            results[name] = self.run_scenario(client, method, url, data, options['iterations'], options['warmup'])
+
+        report = {
+            'meta': {
+                'user': user.username,
+                'task_list': task_list.pk,
+                'task_list_size': task_list.tasks.count(),
+                'iterations': options['iterations'],
+                'database': connection.vendor,
+                'timestamp': timezone.now().isoformat(),
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.print_comparison(options['compare'], results)
+
+    @staticmethod
+    def get_host():
+        return settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+
+    @staticmethod
+    def get_subject(username):
+        if username:
+            try:
+                user = User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"User '{username}' does not exist.")
+            task_list = TaskList.objects.filter(id__in=get_accessible_task_list_ids(user)).annotate(
+                size=Count('tasks')).order_by('-size').first()
+        else:
+            task_list = TaskList.objects.annotate(size=Count('tasks')).order_by('-size').first()
+            user = task_list.created_by if task_list else None
+        if task_list is None:
+            raise CommandError('No task list to benchmark; run seed_data first.')
+        return user, task_list
+
+    def get_scenarios(self, user, task_list, include_writes):
+        list_url = reverse('view_task_list', args=[task_list.pk])
+        task = task_list.tasks.first()
+        category_id = task_list.tasks.exclude(category=None).values_list('category_id', flat=True).first()
+        now = timezone.now()
+
+        yield 'home', 'get', reverse('home'), {}
+        yield 'calendar_events', 'get', reverse('calendar_events'), {
+            'start': now.isoformat(), 'end': (now + timedelta(days=35)).isoformat()}
+        yield 'task_lists', 'get', reverse('task_lists'), {}
+        yield 'view_task_list', 'get', list_url, {}
+        yield 'view_task_list:all', 'get', list_url, {'completed': 'All'}
+        yield 'view_task_list:descending', 'get', list_url, {'completed': 'All', 'sort': '-deadline'}
+        yield 'view_task_list:priority', 'get', list_url, {'priority': 'High'}
+        yield 'view_task_list:assignee', 'get', list_url, {'user_id': user.pk, 'completed': 'All'}
+        if category_id:
+            yield 'view_task_list:category', 'get', list_url, {'category': category_id}
+        yield 'view_task_list:page_10', 'get', list_url, self.deep_page_params(task_list, 10)
+        yield 'search', 'get', reverse('search_tasks'), {'q': task.title.split()[-1] if task else 'task'}
+        yield 'create_task:form', 'get', reverse('create_task', args=[task_list.pk]), {}
+        if task:
+            yield 'update_task:form', 'get', reverse('update_task', args=[task_list.pk, task.pk]), {}
+        if include_writes:
+            task_data = {'title': 'Benchmark task', 'description': '', 'priority': 'Medium',
+                         'assigned_to': [user.pk]}
+            yield 'create_task:submit', 'post', reverse('create_task', args=[task_list.pk]), task_data
+            if task:
+                yield 'update_task:submit', 'post', reverse('update_task', args=[task_list.pk, task.pk]), task_data
+
+    @staticmethod
+    def deep_page_params(task_list, depth):
+        paginator = KeysetPaginator(task_list.tasks.all(), 'deadline', TaskListDetailView.paginate_by)
+        params = {'completed': 'All'}
+        for _ in range(depth - 1):
+            page = paginator.get_page(params.get('cursor'))
+            if not page.has_next:
+                break
+            params['cursor'] = page.next_cursor
+        return params
+
+    @staticmethod
+    def run_scenario(client, method, url, data, iterations, warmup):
+        timings, query_counts, status = [], [], None
+        for iteration in range(warmup + iterations):
+            # Writes are rolled back so every iteration sees the same data.
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = perf_counter()
+                    response = getattr(client, method)(url, data)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    elapsed = perf_counter() - start
+                if method != 'get':
+                    transaction.set_rollback(True)
+            status = response.status_code
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+                query_counts.append(len(queries))
+        return {
+            'status': status,
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(sum(timings) / len(timings), 2),
+            'queries': max(query_counts),
+        }
+
+    def print_comparison(self, path, results):
+        with open(path) as handle:
+            previous = json.load(handle)['results']
+        self.stderr.write(f"{'scenario':32} {'p50 ms':>18} {'p95 ms':>18} {'queries':>12}")
+        for name, current in results.items():
+            before = previous.get(name)
+            if before is None:
+                continue
+            self.stderr.write(
+                f"{name:32} {before['p50_ms']:>8} -> {current['p50_ms']:<7} {before['p95_ms']:>8} -> "
+                f"{current['p95_ms']:<7} {before['queries']:>4} -> {current['queries']:<4}"
+            )
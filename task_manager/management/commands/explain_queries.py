@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from task_manager.views import CalendarEventsView, TaskListDetailView, TaskListView
+
+
+class Command(BaseCommand):
+    help = 'Print the query plan of the main view querysets for a given user.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User whose view querysets are explained.')
+        parser.add_argument('--task-list', type=int, help='Task list used for the detail view (default: newest).')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run EXPLAIN ANALYZE (PostgreSQL only, executes the queries).')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('--analyze is only supported on PostgreSQL.')
+            explain_options = {'analyze': True, 'buffers': True}
+
+        for label, queryset in self.get_querysets(user, options['task_list']):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
+
+    @staticmethod
+    def build_view(view_class, user, params=None, **kwargs):
+        request = RequestFactory().get('/', params or {})
+        request.user = user
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view
+
+    def get_querysets(self, user, task_list_id):
+        overview = self.build_view(TaskListView, user)
+        yield 'Task list overview', overview.get_queryset()
+
+        task_lists = overview.get_queryset()
+        task_list = task_lists.filter(pk=task_list_id).first() if task_list_id else task_lists.first()
+        if task_list is None:
+            raise CommandError('No accessible task list to explain the detail view with.')
+
+        filters = [
+            ('open tasks', {}),
+            ('all tasks, newest deadline first', {'completed': 'All', 'sort': '-deadline'}),
+            ('open tasks by priority', {'priority': 'High'}),
+        ]
+        for description, params in filters:
+            detail = self.build_view(TaskListDetailView, user, params, pk=task_list.pk)
+            detail.object = task_list
+            paginator = detail.get_paginator(detail.get_tasks())
+            yield (f'Task list detail #{task_list.pk}: {description}',
+                   paginator.get_page_querysets()[0][:paginator.page_size + 1])
+
+        now = timezone.now()
+        calendar = self.build_view(CalendarEventsView, user)
+        yield 'Calendar events (next 30 days)', calendar.get_queryset(now, now + timedelta(days=30))
@@ -0,0 +1,40 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.importer import IMPORT_BATCH_SIZE, guess_format, import_tasks, read_rows
+from task_manager.models import TaskList
+
+
+class Command(BaseCommand):
+    help = 'Import tasks into a task list from a CSV, JSON or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task_list_id', type=int)
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--format', choices=['csv', 'json', 'ndjson'],
+                            help='File format (default: guessed from the extension).')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate the rows without saving them.')
+
+    def handle(self, *args, **options):
+        try:
+            task_list = TaskList.objects.select_related('created_by').get(pk=options['task_list_id'])
+        except TaskList.DoesNotExist:
+            raise CommandError(f"Task list {options['task_list_id']} does not exist.")
+
+        file_format = options['format'] or guess_format(options['path'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = import_tasks(task_list, task_list.created_by, read_rows(stream, file_format),
+                                      batch_size=options['batch_size'], dry_run=options['dry_run'])
+        except (OSError, ValueError, csv.Error) as error:
+            raise CommandError(f'Could not import {options["path"]}: {error}')
+
+        for line, errors in report.rejected:
+            details = '; '.join(f"{name}: {' '.join(messages)}" for name, messages in errors.items())
+            self.stderr.write(f'Line {line} rejected: {details}')
+        verb = 'would be imported' if report.dry_run else 'imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{report.created} task(s) {verb}, {len(report.rejected)} row(s) rejected.'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_manager.changes import recount_task_lists
+from task_manager.models import TaskList
+
+
+class Command(BaseCommand):
+    help = 'Recompute the task counters stored on task lists and repair the ones that drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task_list_ids', nargs='*', type=int, help='Lists to check (default: all of them).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of lists checked per transaction.')
+
+    def handle(self, *args, **options):
+        task_lists = TaskList.objects.order_by('id')
+        if options['task_list_ids']:
+            task_lists = task_lists.filter(id__in=options['task_list_ids'])
+        task_list_ids = list(task_lists.values_list('id', flat=True))
+
+        drifted = 0
+        for start in range(0, len(task_list_ids), options['batch_size']):
+            with transaction.atomic():
+                batch = TaskList.objects.select_for_update().filter(
+                    id__in=task_list_ids[start:start + options['batch_size']]
+                )
+                drifted += recount_task_lists(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {len(task_list_ids)} task list(s), {drifted} had drifted and were repaired.'
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from task_manager.jobs import run_due_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run the background jobs queued in the database, such as purging deleted task lists.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due instead of waiting for more.')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds between checks for new jobs.')
+
+    def handle(self, *args, **options):
+        while True:
+            succeeded, failed = run_due_jobs()
+            if succeeded or failed or options['once']:
+                self.stdout.write(self.style.SUCCESS(f'Ran {succeeded + failed} job(s), {failed} failed.'))
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
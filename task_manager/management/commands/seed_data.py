@@ -0,0 +1,134 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager.caching import invalidate_accessible_task_lists
+from task_manager.changes import recount_task_lists
+from task_manager.models import Category, Task, TaskList
+
+PRIORITIES = ['High', 'Medium', 'Low']
+PRIORITY_WEIGHTS = [20, 50, 30]
+WORDS = ['report', 'review', 'invoice', 'meeting', 'deploy', 'design', 'budget', 'client', 'release', 'audit',
+         'onboarding', 'migration', 'roadmap', 'backup', 'newsletter', 'contract', 'hiring', 'training', 'survey']
+VERBS = ['Prepare', 'Send', 'Review', 'Update', 'Plan', 'Fix', 'Write', 'Call about', 'Check', 'Archive']
+CATEGORY_NAMES = ['Work', 'Personal', 'Urgent', 'Errands', 'Finance', 'Health', 'Family', 'Ideas']
+
+
+class Command(BaseCommand):
+    help = 'Seed the database with synthetic users, task lists, shares, categories and tasks using bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--lists', type=int, default=200)
+        parser.add_argument('--tasks', type=int, default=20000)
+        parser.add_argument('--categories-per-user', type=int, default=4)
+        parser.add_argument('--max-shares', type=int, default=5, help='Maximum number of users a list is shared with.')
+        parser.add_argument('--prefix', default='seed', help='Prefix of the generated usernames.')
+        parser.add_argument('--password', default='password', help='Password of every generated user.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for reproducible data sets.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['lists'] < 1:
+            raise CommandError('At least one user and one list are needed.')
+        if User.objects.filter(username__startswith=f"{options['prefix']}_").exists():
+            raise CommandError(f"Users prefixed with '{options['prefix']}_' already exist; choose another --prefix.")
+
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        with transaction.atomic():
+            users = self.create_users(options['users'], options['prefix'], options['password'])
+            task_lists = self.create_task_lists(users, options['lists'])
+            members = self.share_task_lists(task_lists, users, options['max_shares'])
+            categories = self.create_categories(users, options['categories_per_user'])
+            task_count = self.create_tasks(task_lists, members, categories, options['tasks'])
+            # bulk_create() skips the signals that maintain the task counters.
+            recount_task_lists(TaskList.objects.filter(id__in=[task_list.id for task_list in task_lists]))
+        invalidate_accessible_task_lists([user.id for user in users])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users, {len(task_lists)} task lists and {task_count} tasks.'
+        ))
+
+    def create_users(self, count, prefix, password):
+        # Hashing once keeps seeding fast; every generated user shares the same password.
+        password_hash = make_password(password)
+        return User.objects.bulk_create([
+            User(username=f'{prefix}_{index}', email=f'{prefix}_{index}@example.com', password=password_hash)
+            for index in range(count)
+        ], batch_size=self.batch_size)
+
+    def create_task_lists(self, users, count):
+        # A few very active users own most of the lists.
+        weights = [1 / (rank + 1) for rank in range(len(users))]
+        owners = self.random.choices(users, weights=weights, k=count)
+        return TaskList.objects.bulk_create([
+            TaskList(title=f'{self.random.choice(WORDS).capitalize()} board {index}', created_by=owner)
+            for index, owner in enumerate(owners)
+        ], batch_size=self.batch_size)
+
+    def share_task_lists(self, task_lists, users, max_shares):
+        through = TaskList.shared_with.through
+        rows, members = [], {}
+        for task_list in task_lists:
+            share_count = self.random.randint(0, max_shares)
+            picked = self.random.sample(users, min(len(users), share_count + 1))
+            shared = [user for user in picked if user.id != task_list.created_by_id][:share_count]
+            rows += [through(tasklist_id=task_list.id, user_id=user.id) for user in shared]
+            members[task_list.id] = [task_list.created_by_id] + [user.id for user in shared]
+        through.objects.bulk_create(rows, batch_size=self.batch_size)
+        return members
+
+    def create_categories(self, users, per_user):
+        categories = Category.objects.bulk_create([
+            Category(name=name, created_by=user)
+            for user in users
+            for name in self.random.sample(CATEGORY_NAMES, min(per_user, len(CATEGORY_NAMES)))
+        ], batch_size=self.batch_size)
+        by_user = {}
+        for category in categories:
+            by_user.setdefault(category.created_by_id, []).append(category.id)
+        return by_user
+
+    def create_tasks(self, task_lists, members, categories, count):
+        # List sizes follow a Pareto distribution: most lists are small, a few hold thousands of tasks.
+        weights = [self.random.paretovariate(1.2) for _ in task_lists]
+        assignments = self.random.choices(task_lists, weights=weights, k=count)
+
+        through = Task.assigned_to.through
+        created = 0
+        for start in range(0, count, self.batch_size):
+            tasks, assignees = [], []
+            for task_list in assignments[start:start + self.batch_size]:
+                tasks.append(self.build_task(task_list, categories.get(task_list.created_by_id, [])))
+                list_members = members[task_list.id]
+                assignees.append(self.random.sample(list_members, min(len(list_members), self.random.randint(0, 2))))
+            Task.objects.bulk_create(tasks)
+            through.objects.bulk_create([
+                through(task_id=task.id, user_id=user_id)
+                for task, user_ids in zip(tasks, assignees) for user_id in user_ids
+            ])
+            created += len(tasks)
+        return created
+
+    def build_task(self, task_list, category_ids):
+        deadline = None
+        if self.random.random() > 0.15:
+            deadline = self.now + timedelta(days=self.random.gauss(10, 40), hours=self.random.randint(0, 23))
+        overdue = deadline is not None and deadline < self.now
+        return Task(
+            title=f'{self.random.choice(VERBS)} {self.random.choice(WORDS)}',
+            description=' '.join(self.random.choices(WORDS, k=self.random.randint(0, 25))) or None,
+            deadline=deadline,
+            priority=self.random.choices(PRIORITIES, weights=PRIORITY_WEIGHTS)[0],
+            completed=self.random.random() < (0.7 if overdue else 0.15),
+            task_list=task_list,
+            category_id=self.random.choice(category_ids) if category_ids and self.random.random() < 0.6 else None,
+        )
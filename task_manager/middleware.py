@@ -0,0 +1,223 @@
+import json
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from task_manager.routers import STICKY_COOKIE_NAME, RoutingState, _routing_state
+
+logger = logging.getLogger('task_manager.performance')
+
+IN_CLAUSE_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Declare the maximum number of queries a function-based view may run per request.
+
+    Like the `query_budget` attribute of class-based views, `max_queries` is a number or a dict mapping HTTP
+    methods to numbers.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(*args, **kwargs):
+            return view_func(*args, **kwargs)
+        wrapped_view.query_budget = max_queries
+        return wrapped_view
+    return decorator
+
+
+def get_view_attribute(view_func, name, default=None):
+    # Class-based views expose their class as view_class (Django) or cls (DRF).
+    view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+    return getattr(view_class, name, getattr(view_func, name, default))
+
+
+def get_query_budget(view_func, method='GET'):
+    """
+    Return the query budget the view declares for `method`, or None.
+
+    A budget given per method as a dict, e.g. {'GET': 3, 'POST': 7}, falls back to its GET entry for the
+    methods it leaves out (HEAD, OPTIONS...).
+    """
+    budget = get_view_attribute(view_func, 'query_budget')
+    if isinstance(budget, dict):
+        return budget.get(method, budget.get('GET'))
+    return budget
+
+
+class QueryRecorder:
+    """execute_wrapper that counts queries, their database time and repeated statements."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+            self.signatures[IN_CLAUSE_RE.sub('IN (...)', sql)] += 1
+
+    def duplicates(self):
+        return {sql: count for sql, count in self.signatures.items() if count > 1}
+
+
+_active_recorder = ContextVar('task_manager_query_recorder', default=None)
+
+
+def _record_in_active_recorder(execute, sql, params, many, context):
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install_context_recorder():
+    for connection in connections.all():
+        if _record_in_active_recorder not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_record_in_active_recorder)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the query count, database time, repeated queries and wall time of each request.
+
+    The numbers are added as a Server-Timing header and logged to `task_manager.performance`.
+    Views can declare a `query_budget`, a number or a dict of numbers per HTTP method; going over it logs a
+    warning, or raises QueryBudgetExceeded when settings.QUERY_BUDGET_ENFORCE is set (as the budget tests do).
+    Queries run while a streaming response is consumed are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self.report(request, response, recorder, perf_counter() - start)
+
+    async def __acall__(self, request):
+        # The queries of an async request run on the thread sync_to_async hands them to, not on this one,
+        # so the recorder follows the request's context instead of wrapping this thread's connections.
+        recorder = QueryRecorder()
+        start = perf_counter()
+        await sync_to_async(_install_context_recorder)()
+        token = _active_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _active_recorder.reset(token)
+        return self.report(request, response, recorder, perf_counter() - start)
+
+    @staticmethod
+    def report(request, response, recorder, wall_time):
+        response['Server-Timing'] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+            f'app;dur={wall_time * 1000:.1f}'
+        )
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        budget = getattr(request, 'query_budget', None)
+        record = {
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 1),
+            'wall_ms': round(wall_time * 1000, 1),
+            'duplicates': recorder.duplicates(),
+            'query_budget': budget,
+        }
+        logger.info(json.dumps(record))
+
+        if budget is not None and recorder.count > budget:
+            message = f'{view_name} ran {recorder.count} queries, over its budget of {budget}.'
+            if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={'performance': record})
+        return response
+
+    @staticmethod
+    def process_view(request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read from the replica during GET requests to views declaring `use_replica = True` (see task_manager.routers).
+
+    A request that writes sets a cookie sending that browser's reads to the primary for
+    settings.DATABASE_REPLICA_STICKY_SECONDS, so it sees its own changes despite replication lag.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.stick_to_primary(response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.stick_to_primary(response, state)
+
+    @staticmethod
+    def process_view(request, view_func, view_args, view_kwargs):
+        # The state is shared with the handler, which may call this through sync_to_async.
+        _routing_state.get().use_replica = bool(
+            settings.DATABASE_REPLICA
+            and request.method in ('GET', 'HEAD')
+            and get_view_attribute(view_func, 'use_replica', False)
+            and STICKY_COOKIE_NAME not in request.COOKIES
+        )
+
+    @staticmethod
+    def stick_to_primary(response, state):
+        if state.wrote and settings.DATABASE_REPLICA:
+            response.set_cookie(
+                STICKY_COOKIE_NAME, '1', max_age=settings.DATABASE_REPLICA_STICKY_SECONDS, httponly=True,
+                samesite='Lax',
+            )
+        return response
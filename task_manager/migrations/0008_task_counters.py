@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:15
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tasks(apps, schema_editor):
+    TaskList = apps.get_model('task_manager', 'TaskList')
+    Task = apps.get_model('task_manager', 'Task')
+
+    def task_count(**filters):
+        tasks = Task.objects.filter(task_list=OuterRef('pk'), **filters).order_by().values('task_list')
+        return Coalesce(Subquery(tasks.annotate(count=Count('id')).values('count')), 0)
+
+    TaskList.objects.update(total_tasks=task_count(), completed_tasks=task_count(completed=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasklist',
+            name='completed_tasks',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tasklist',
+            name='total_tasks',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-18 02:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0008_task_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('deadline', models.DateTimeField(blank=True, null=True)),
+                ('priority', models.CharField(max_length=20)),
+                ('completed', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('assigned_to', models.ManyToManyField(related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to='task_manager.category')),
+                ('task_list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='task_manager.tasklist')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task_list', 'deadline', 'id'], name='archived_list_deadline_idx')],
+            },
+        ),
+    ]
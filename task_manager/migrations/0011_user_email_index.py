@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations, models
+
+# auth.User ships without an index on email; sharing looks recipients up by it.
+EMAIL_INDEX = models.Index(fields=['email'], name='task_manager_user_email_idx')
+
+
+def create_email_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model(settings.AUTH_USER_MODEL), EMAIL_INDEX)
+
+
+def drop_email_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model(settings.AUTH_USER_MODEL), EMAIL_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0010_job_tasklist_deleted_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
@@ -1,17 +1,70 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 
+class CachedUser(User):
+    """
+    A User as kept in the cache by caching.get_cached_user: every field but the password hash.
+
+    The password is deferred, so reading it queries the database. The session check uses the session auth hash
+    computed from it when the user was cached instead.
+    """
+    session_auth_hash = None
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_cache_data(cls, data, db):
+        user = cls.from_db(db, list(data['fields']), list(data['fields'].values()))
+        user.session_auth_hash = data['session_auth_hash']
+        return user
+
+    def get_cache_data(self):
+        fields = {field.attname: getattr(self, field.attname)
+                  for field in self._meta.concrete_fields if field.attname != 'password'}
+        return {'fields': fields, 'session_auth_hash': self.get_session_auth_hash()}
+
+    def get_session_auth_hash(self):
+        return self.session_auth_hash or super().get_session_auth_hash()
+
+
 class TaskList(models.Model):
     title = models.CharField(max_length=200)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_lists')
     shared_with = models.ManyToManyField(User, related_name='shared_task_lists', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also moved forward when the list's tasks or sharing change (see task_manager.changes).
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained with F() updates next to every task write (see task_manager.changes); `recount` repairs drift.
+    total_tasks = models.IntegerField(default=0, editable=False)
+    completed_tasks = models.IntegerField(default=0, editable=False)
+    # Set when the list is deleted: it is hidden at once and purged later by a job (see task_manager.purge).
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='tasklist_owner_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    # Columns only ever changed with UPDATE statements; a save must not write back the values it loaded.
+    UPDATE_ONLY_FIELDS = frozenset({'total_tasks', 'completed_tasks', 'deleted_at'})
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding:
+            update_fields = [field.name for field in self._meta.concrete_fields
+                             if not field.primary_key and field.name not in self.UPDATE_ONLY_FIELDS]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    @property
+    def not_completed_tasks(self):
+        return self.total_tasks - self.completed_tasks
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -30,11 +83,84 @@ class Task(models.Model):
     assigned_to = models.ManyToManyField(User, related_name='assigned_tasks')
     completed = models.BooleanField(default=False)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')
+    updated_at = models.DateTimeField(auto_now=True)
+    # Filled by a database trigger on PostgreSQL, left empty elsewhere (see task_manager.search). Its GIN index is
+    # created by migration 0006 on PostgreSQL only and kept out of Meta.indexes, so other backends never build it.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_list', 'completed', 'deadline', 'id'], name='task_list_status_deadline_idx'),
+            models.Index(fields=['task_list', 'priority'], name='task_list_priority_idx'),
+            models.Index(fields=['task_list', 'category'], name='task_list_category_idx'),
+            models.Index(fields=['deadline'], condition=models.Q(completed=False, deadline__isnull=False),
+                         name='task_open_deadline_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    # The post_save and post_delete handlers update the list's counters; running them in the same
+    # transaction as the task write keeps the two from diverging.
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            return super().delete(*args, **kwargs)
+
     def is_overdue(self):
         if self.deadline:
             return timezone.now() > self.deadline
         return False
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of the Task table by task_manager.archive, under its original id.
+
+    Kept apart so the queries and indexes over live tasks do not grow with history; the list detail page only
+    reads it when asked to show archived tasks.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    deadline = models.DateTimeField(blank=True, null=True)
+    priority = models.CharField(max_length=20)
+    task_list = models.ForeignKey(TaskList, on_delete=models.CASCADE, related_name='archived_tasks')
+    assigned_to = models.ManyToManyField(User, related_name='archived_tasks')
+    completed = models.BooleanField(default=True)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='archived_tasks')
+    # The task's updated_at when it was archived.
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_list', 'deadline', 'id'], name='archived_list_deadline_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class Job(models.Model):
+    """Background work queued in the database and run by the run_jobs command (see task_manager.jobs)."""
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    # Not picked up before then: pushed back after a failure, and by a lease while a worker runs the job.
+    run_after = models.DateTimeField(default=timezone.now)
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after', 'id'], condition=models.Q(failed=False), name='job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
@@ -0,0 +1,137 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    page_size: int = 0
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over (field, pk) with NULL values of `field` sorted last.
+
+    Each page is fetched with a WHERE clause on the last seen key instead of an
+    OFFSET, so the cost of a page does not depend on how deep it is.
+    """
+
+    def __init__(self, queryset, field_name, page_size, descending=False):
+        self.queryset = queryset
+        self.field_name = field_name
+        self.page_size = page_size
+        self.descending = descending
+
+    @staticmethod
+    def encode_cursor(value, pk, reverse=False):
+        payload = {'v': value.isoformat() if value is not None else None, 'pk': pk, 'r': reverse}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            value = parse_datetime(payload['v']) if payload['v'] is not None else None
+            return value, int(payload['pk']), bool(payload['r'])
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            return None
+
+    def _ordering(self, descending, nulls_last):
+        nulls = {'nulls_last': True} if nulls_last else {'nulls_first': True}
+        if descending:
+            return F(self.field_name).desc(**nulls), F('pk').desc()
+        return F(self.field_name).asc(**nulls), F('pk').asc()
+
+    def _after(self, value, pk, descending, nulls_last):
+        """
+        Return the conditions selecting the rows after (value, pk), one per segment of the ordering still ahead.
+
+        The NULL and non-NULL values of the field are separate segments, read one after the other, so each
+        condition is a range of the (field, pk) index rather than an OR the planner has to scan for.
+        """
+        lookup, bound = ('lt', 'lte') if descending else ('gt', 'gte')
+        null_segment = Q(**{f'{self.field_name}__isnull': True})
+        if value is None:
+            segments = [null_segment & Q(**{f'pk__{lookup}': pk})]
+            if not nulls_last:
+                segments.append(Q(**{f'{self.field_name}__isnull': False}))
+            return segments
+        # The redundant bound on the field alone gives the index a start key.
+        segments = [Q(**{f'{self.field_name}__{bound}': value}) & (
+            Q(**{f'{self.field_name}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk})
+        )]
+        if nulls_last:
+            segments.append(null_segment)
+        return segments
+
+    def _cursor_for(self, obj, reverse):
+        return self.encode_cursor(getattr(obj, self.field_name), obj.pk, reverse)
+
+    def get_page_querysets(self, position=None):
+        """Return the querysets a page is read from, in order, until one more row than the page size is found."""
+        reverse = position is not None and position[2]
+
+        # Walking backwards is a forward walk over the mirrored ordering.
+        descending = self.descending != reverse
+        nulls_last = not reverse
+        queryset = self.queryset.order_by(*self._ordering(descending, nulls_last))
+        if position is None:
+            return [queryset]
+        return [queryset.filter(condition) for condition in self._after(position[0], position[1], descending,
+                                                                        nulls_last)]
+
+    def get_page(self, cursor=None):
+        position = self.decode_cursor(cursor) if cursor else None
+        rows = []
+        for queryset in self.get_page_querysets(position):
+            rows += queryset[:self.page_size + 1 - len(rows)]
+            if len(rows) > self.page_size:
+                break
+        return self._build_page(rows, position)
+
+    async def aget_page(self, cursor=None):
+        position = self.decode_cursor(cursor) if cursor else None
+        rows = []
+        for queryset in self.get_page_querysets(position):
+            rows += [row async for row in queryset[:self.page_size + 1 - len(rows)]]
+            if len(rows) > self.page_size:
+                break
+        return self._build_page(rows, position)
+
+    def _build_page(self, rows, position):
+        reverse = position is not None and position[2]
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        page = KeysetPage(object_list=rows, page_size=self.page_size)
+        if not rows:
+            return page
+        has_next, has_previous = (True, has_more) if reverse else (has_more, position is not None)
+        if has_next:
+            page.next_cursor = self._cursor_for(rows[-1], reverse=False)
+        if has_previous:
+            page.previous_cursor = self._cursor_for(rows[0], reverse=True)
+        return page
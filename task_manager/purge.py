@@ -0,0 +1,64 @@
+"""
+Deleting task lists and tasks in batches of ids.
+
+Tasks are deleted with QuerySet.delete() on querysets that load nothing but their ids: the delete signals of a
+queryset delete leave the counters, caches and events alone, and the callers record those changes themselves.
+
+Deleting a task list only hides it; the purge_task_list job then deletes its rows in batches, each in its own
+transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager.caching import bump_task_list_versions, invalidate_accessible_task_lists, \
+    invalidate_task_list_members
+from task_manager.jobs import enqueue
+from task_manager.models import ArchivedTask, Task, TaskList
+
+BATCH_SIZE = 500
+
+
+def _delete(model, ids):
+    # The collector deletes the assignee rows with one statement and only needs the ids of the rows themselves.
+    deleted = model.objects.filter(id__in=ids).only('id').delete()[1]
+    return deleted.get(model._meta.label, 0)
+
+
+def delete_tasks(task_ids):
+    """Delete these tasks and their assignee rows with one statement each; returns the number of tasks deleted."""
+    return _delete(Task, list(task_ids))
+
+
+def delete_archived_tasks(task_ids):
+    return _delete(ArchivedTask, list(task_ids))
+
+
+def soft_delete_task_list(task_list):
+    """Hide `task_list` from everyone now and queue the job that deletes it."""
+    with transaction.atomic(savepoint=False):
+        now = timezone.now()
+        TaskList.objects.filter(pk=task_list.pk).update(deleted_at=now, updated_at=now)
+        task_list.deleted_at = task_list.updated_at = now
+        shared_with_ids = list(task_list.shared_with.values_list('id', flat=True))
+        invalidate_accessible_task_lists([task_list.created_by_id, *shared_with_ids])
+        invalidate_task_list_members([task_list.pk])
+        bump_task_list_versions([task_list.pk])
+        enqueue('purge_task_list', task_list_id=task_list.pk)
+
+
+def purge_task_list(task_list_id, batch_size=None):
+    """Job handler: delete a soft-deleted task list, its tasks and archived tasks, `batch_size` rows at a time."""
+    batch_size = batch_size or BATCH_SIZE
+    if not TaskList.objects.filter(pk=task_list_id, deleted_at__isnull=False).exists():
+        return
+    # A task written to the list by a request that passed its access check just before the deletion is deleted
+    # with the list at the end.
+    for model, delete in ((Task, delete_tasks), (ArchivedTask, delete_archived_tasks)):
+        while True:
+            with transaction.atomic():
+                rows = model.objects.filter(task_list_id=task_list_id).order_by('id')
+                task_ids = list(rows.values_list('id', flat=True)[:batch_size])
+                if not task_ids:
+                    break
+                delete(task_ids)
+    TaskList.objects.filter(pk=task_list_id).delete()
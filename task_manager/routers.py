@@ -0,0 +1,65 @@
+"""
+Send the reads of GET requests to read-only views to settings.DATABASE_REPLICA, when one is configured.
+
+ReplicaRoutingMiddleware decides once per request and keeps the decision in a context variable, so it also
+reaches the queries async views run through sync_to_async.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+
+STICKY_COOKIE_NAME = 'use_primary'
+
+# Sessions and users are always read from the primary: a lagging copy could accept a password just changed.
+PRIMARY_ONLY_APPS = {'auth', 'sessions'}
+
+
+@dataclass
+class RoutingState:
+    use_replica: bool = False
+    wrote: bool = False
+
+
+_routing_state = ContextVar('task_manager_routing_state', default=None)
+
+
+def reading_from_replica():
+    state = _routing_state.get()
+    return state is not None and state.use_replica
+
+
+def cache_timeout(timeout):
+    """
+    Shorten `timeout` for data read from the replica.
+
+    Invalidations run when a write commits on the primary, so a lagging replica can hand out data that predates
+    the last invalidation; it must not stay cached long.
+    """
+    if not reading_from_replica():
+        return timeout
+    sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+    return sticky_seconds if timeout is None else min(timeout, sticky_seconds)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Proxies such as CachedUser go where the model they proxy goes.
+        app_label = model._meta.concrete_model._meta.app_label
+        if settings.DATABASE_REPLICA and reading_from_replica() and app_label not in PRIMARY_ONLY_APPS:
+            return settings.DATABASE_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        # Not None: Django would write an instance back to the database it was read from.
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,100 @@
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from task_manager.caching import get_accessible_task_list_ids
+from task_manager.models import Task
+
+SEARCH_CONFIG = 'english'
+SNIPPET_WORDS = 30
+
+# Matches are delimited with control characters, which survive HTML escaping and are then
+# swapped for <mark> tags, so task text never reaches the page unescaped.
+MATCH_START = '\x02'
+MATCH_STOP = '\x03'
+
+
+def highlight(text):
+    """Escape `text` and turn the match markers into <mark> tags."""
+    if not text:
+        return ''
+    html = escape(text).replace(MATCH_START, '<mark>').replace(MATCH_STOP, '</mark>')
+    return mark_safe(html)
+
+
+def search_tasks(user, query):
+    """
+    Return the tasks visible to `user` whose title or description match `query`, best match first.
+
+    Pass the page being displayed to add_highlights() to get the highlighted title and snippet.
+    """
+    tasks = Task.objects.filter(
+        task_list_id__in=get_accessible_task_list_ids(user)
+    ).select_related('task_list', 'category')
+    if connections[tasks.db].vendor == 'postgresql':
+        return _search_postgresql(tasks, query)
+    return _search_fallback(tasks, query)
+
+
+def _search_postgresql(tasks, query):
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    headline_options = {'config': SEARCH_CONFIG, 'start_sel': MATCH_START, 'stop_sel': MATCH_STOP}
+    return tasks.filter(search_vector=search_query).annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+        raw_title_headline=SearchHeadline('title', search_query, highlight_all=True, **headline_options),
+        raw_snippet=SearchHeadline(Coalesce('description', Value('')), search_query,
+                                   max_words=SNIPPET_WORDS, min_words=SNIPPET_WORDS // 2, **headline_options),
+    ).order_by('-rank', 'id')
+
+
+def _search_fallback(tasks, query):
+    terms = query.split()
+    if not terms:
+        return tasks.none()
+    for term in terms:
+        tasks = tasks.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    # Rank title matches above description-only matches, like the A/B weights on PostgreSQL.
+    title_matches = [When(title__icontains=term, then=Value(1)) for term in terms]
+    return tasks.annotate(
+        rank=sum((Case(when, default=Value(0), output_field=IntegerField()) for when in title_matches), Value(0)),
+    ).order_by('-rank', 'id')
+
+
+def mark_matches(text, query):
+    """Wrap every case-insensitive occurrence of the query terms in match markers."""
+    terms = sorted({re.escape(term) for term in query.split()}, key=len, reverse=True)
+    if not text or not terms:
+        return text or ''
+    return re.sub('(' + '|'.join(terms) + ')', rf'{MATCH_START}\1{MATCH_STOP}', text, flags=re.IGNORECASE)
+
+
+def snippet_around_match(text, query, words=SNIPPET_WORDS):
+    """Return about `words` words of `text` starting a little before the first match."""
+    tokens = (text or '').split()
+    lowered_terms = [term.lower() for term in query.split()]
+    first = next((index for index, token in enumerate(tokens)
+                  if any(term in token.lower() for term in lowered_terms)), 0)
+    start = max(first - words // 3, 0)
+    snippet = ' '.join(tokens[start:start + words])
+    if start > 0:
+        snippet = '… ' + snippet
+    if start + words < len(tokens):
+        snippet += ' …'
+    return snippet
+
+
+def add_highlights(tasks, query):
+    """Set `title_headline` and `snippet` on each task of an evaluated page of search results."""
+    for task in tasks:
+        if hasattr(task, 'raw_title_headline'):
+            task.title_headline = highlight(task.raw_title_headline)
+            task.snippet = highlight(task.raw_snippet)
+        else:
+            task.title_headline = highlight(mark_matches(task.title, query))
+            task.snippet = highlight(mark_matches(snippet_around_match(task.description, query), query))
+    return tasks
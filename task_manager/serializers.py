@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from rest_framework import serializers
+
+from task_manager.caching import get_accessible_task_list_ids, get_task_list_member_ids
+from task_manager.models import TaskList, Task, Category
+
+
+class SparseFieldsMixin:
+    """Limit the serialized fields to the comma-separated `?fields=` query parameter."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        requested = request.query_params.get('fields') if request is not None else None
+        if requested:
+            allowed = {name.strip() for name in requested.split(',')}
+            for name in set(self.fields) - allowed:
+                self.fields.pop(name)
+
+
+class TaskListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    created_by = serializers.ReadOnlyField(source='created_by.username')
+    shared_with = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = TaskList
+        fields = ['id', 'title', 'created_by', 'shared_with', 'created_at']
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name']
+
+
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    priority = serializers.ChoiceField(choices=['High', 'Medium', 'Low'])
+    task_list = serializers.PrimaryKeyRelatedField(queryset=TaskList.objects.all())
+    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), allow_null=True, required=False)
+    category_name = serializers.ReadOnlyField(source='category.name', default=None)
+    assigned_to = serializers.PrimaryKeyRelatedField(many=True, queryset=User.objects.all(), required=False)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'description', 'deadline', 'priority', 'completed', 'task_list', 'category',
+                  'category_name', 'assigned_to']
+
+    def validate_task_list(self, task_list):
+        if task_list.id not in get_accessible_task_list_ids(self.context['request'].user):
+            raise serializers.ValidationError('You do not have access to this task list.')
+        return task_list
+
+    def validate(self, attrs):
+        task_list = attrs.get('task_list') or self.instance.task_list
+        member_ids = get_task_list_member_ids(task_list)
+        if any(user.id not in member_ids for user in attrs.get('assigned_to', [])):
+            raise serializers.ValidationError({'assigned_to': 'Tasks can only be assigned to members of the list.'})
+
+        category = attrs.get('category')
+        user = self.context['request'].user
+        if category is not None and category.created_by_id != user.id and \
+                not category.tasks.filter(task_list=task_list).exists():
+            raise serializers.ValidationError({'category': 'Unknown category.'})
+        return attrs
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+
+from task_manager.caching import invalidate_accessible_task_lists, invalidate_task_list_members
+from task_manager.changes import task_lists_changed
+from task_manager.models import TaskList
+
+
+@dataclass
+class ShareReport:
+    shared: int = 0
+    already_shared: int = 0
+    not_found: list = field(default_factory=list)
+
+
+def share_task_list(task_list, emails=(), group=None):
+    """
+    Share `task_list` with the users having one of `emails` and with the members of `group`.
+
+    Recipients are resolved with one query on the indexed email column and added with a single bulk insert,
+    whatever their number. Returns a ShareReport; addresses matching no user end up in `not_found`.
+    """
+    recipients = Q(email__in=emails)
+    if group is not None:
+        recipients |= Q(groups=group)
+    users = dict(User.objects.filter(recipients).values_list('id', 'email').distinct())
+    found_emails = set(users.values())
+    report = ShareReport(not_found=[email for email in emails if email not in found_emails])
+    # The owner has access already.
+    users.pop(task_list.created_by_id, None)
+    if not users:
+        return report
+
+    through = TaskList.shared_with.through
+    with transaction.atomic(savepoint=False):
+        already_shared = set(
+            through.objects.filter(tasklist_id=task_list.pk, user_id__in=users).values_list('user_id', flat=True)
+        )
+        new_user_ids = users.keys() - already_shared
+        if new_user_ids:
+            # ignore_conflicts covers rows another request inserted since the check above.
+            through.objects.bulk_create(
+                [through(tasklist_id=task_list.pk, user_id=user_id) for user_id in new_user_ids],
+                ignore_conflicts=True,
+            )
+            # bulk_create() sends no m2m_changed, so the work of the sharing signal handler is done here.
+            invalidate_accessible_task_lists(new_user_ids)
+            invalidate_task_list_members([task_list.pk])
+            task_lists_changed([task_list.pk])
+    report.shared, report.already_shared = len(new_user_ids), len(already_shared)
+    return report
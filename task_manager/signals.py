@@ -0,0 +1,171 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from task_manager.caching import bump_task_list_versions, get_accessible_task_list_ids, \
+    invalidate_accessible_task_lists, invalidate_task_list_categories, invalidate_task_list_members, invalidate_users
+from task_manager.changes import task_lists_changed, tasks_changed
+from task_manager.events import publish_task_events, task_event
+from task_manager.models import CachedUser, Category, Task, TaskList
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=CachedUser)
+@receiver(post_delete, sender=CachedUser)
+def user_changed(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=TaskList)
+def task_list_saved(sender, instance, **kwargs):
+    invalidate_accessible_task_lists([instance.created_by_id])
+    invalidate_task_list_members([instance.pk])
+    bump_task_list_versions([instance.pk])
+
+
+@receiver(pre_delete, sender=TaskList)
+def task_list_deleting(sender, instance, **kwargs):
+    # The shared_with rows are gone by post_delete, so remember who had access.
+    instance._shared_with_ids = list(instance.shared_with.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=TaskList)
+def task_list_deleted(sender, instance, **kwargs):
+    invalidate_accessible_task_lists([instance.created_by_id, *getattr(instance, '_shared_with_ids', [])])
+    invalidate_task_list_members([instance.pk])
+    bump_task_list_versions([instance.pk])
+
+
+@receiver(m2m_changed, sender=TaskList.shared_with.through)
+def task_list_sharing_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance is a User and pk_set holds task list ids.
+        if action == 'pre_clear':
+            instance._cleared_task_list_ids = list(instance.shared_task_lists.values_list('id', flat=True))
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_accessible_task_lists([instance.pk])
+            task_list_ids = pk_set if action != 'post_clear' else instance.__dict__.pop('_cleared_task_list_ids', [])
+            invalidate_task_list_members(task_list_ids)
+            task_lists_changed(task_list_ids)
+    elif action == 'pre_clear':
+        instance._cleared_shared_with_ids = list(instance.shared_with.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = pk_set if action != 'post_clear' else instance.__dict__.pop('_cleared_shared_with_ids', [])
+        invalidate_accessible_task_lists(user_ids)
+        invalidate_task_list_members([instance.pk])
+        task_lists_changed([instance.pk])
+
+
+@receiver(post_init, sender=Task)
+def task_loaded(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not fetched just for this.
+    instance._loaded_task_list_id = instance.__dict__.get('task_list_id')
+    instance._loaded_completed = instance.__dict__.get('completed')
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+
+
+def _reload_stored_state(instance):
+    # The counters move by the difference with the row being overwritten, which a concurrent toggle or move may
+    # have changed since the task was loaded. Task.save() and delete() run in a transaction, so the row stays
+    # locked until the counters are updated.
+    stored = Task.objects.select_for_update().filter(pk=instance.pk).values_list('task_list_id', 'completed').first()
+    if stored is not None:
+        instance._loaded_task_list_id, instance._loaded_completed = stored
+
+
+@receiver(pre_save, sender=Task)
+def task_saving(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and not {'task_list', 'completed'} & update_fields):
+        return
+    _reload_stored_state(instance)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, update_fields=None, **kwargs):
+    completed = int(instance.completed)
+    loaded_task_list_id = instance._loaded_task_list_id
+    if update_fields is not None and 'task_list' not in update_fields:
+        loaded_task_list_id = None
+    loaded_completed = instance._loaded_completed
+    if update_fields is not None and 'completed' not in update_fields:
+        loaded_completed = None
+
+    events = []
+    if created:
+        count_deltas = {instance.task_list_id: (1, completed)}
+        events.append(task_event('created', instance))
+    elif loaded_task_list_id not in (None, instance.task_list_id):
+        # Moved to another list, which changes the previous list as well.
+        count_deltas = {
+            loaded_task_list_id: (-1, -int(bool(instance._loaded_completed))),
+            instance.task_list_id: (1, completed),
+        }
+        publish_task_events(loaded_task_list_id, [task_event('deleted', instance)])
+        events.append(task_event('created', instance))
+    else:
+        count_deltas = {}
+        if loaded_completed is not None:
+            count_deltas = {instance.task_list_id: (0, completed - int(loaded_completed))}
+            if completed != loaded_completed:
+                events.append(task_event('completed', instance))
+        if update_fields is None or not set(update_fields) <= {'completed', 'updated_at'}:
+            events.append(task_event('updated', instance))
+    task_lists_changed([instance.task_list_id], count_deltas)
+    publish_task_events(instance.task_list_id, events)
+    moved = loaded_task_list_id not in (None, instance.task_list_id)
+    if (instance.category_id is not None and (created or moved)) or \
+            instance.category_id != instance._loaded_category_id:
+        invalidate_task_list_categories([loaded_task_list_id, instance.task_list_id])
+    task_loaded(sender, instance)
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance, origin=None, **kwargs):
+    if origin is None or origin is instance:
+        _reload_stored_state(instance)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, origin=None, **kwargs):
+    if origin is not None and origin is not instance:
+        # Queryset and cascade deletes update their lists once instead of once per task.
+        return
+    task_list_id = instance._loaded_task_list_id or instance.task_list_id
+    completed = instance.completed if instance._loaded_completed is None else instance._loaded_completed
+    task_lists_changed([task_list_id], {task_list_id: (-1, -int(completed))})
+    publish_task_events(task_list_id, [task_event('deleted', instance)])
+    if instance.category_id is not None:
+        invalidate_task_list_categories([task_list_id])
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def task_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            tasks_changed([instance.pk], [instance.task_list_id])
+            publish_task_events(instance.task_list_id, [{'type': 'updated', 'id': instance.pk}])
+        return
+    # instance is a User and pk_set holds task ids.
+    if action in ('pre_add', 'pre_remove', 'pre_clear'):
+        tasks = instance.assigned_tasks.all() if action == 'pre_clear' else Task.objects.filter(id__in=pk_set)
+        instance._assigned_tasks = list(tasks.values_list('id', 'task_list_id'))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        assigned_tasks = instance.__dict__.pop('_assigned_tasks', [])
+        tasks_changed([task_id for task_id, _ in assigned_tasks], {task_list_id for _, task_list_id in assigned_tasks})
+        for task_id, task_list_id in assigned_tasks:
+            publish_task_events(task_list_id, [{'type': 'updated', 'id': task_id}])
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # Task rows print the category name, every list the owner opens offers it as a filter, and deleting it
+    # nulls the category of the tasks, archived ones included, without sending signals.
+    task_list_ids = set(get_accessible_task_list_ids(instance.created_by))
+    if not kwargs.get('created'):
+        used_in = set(instance.tasks.values_list('task_list_id', flat=True))
+        invalidate_task_list_categories(used_in)
+        task_list_ids.update(used_in)
+        task_list_ids.update(instance.archived_tasks.values_list('task_list_id', flat=True))
+    task_lists_changed(task_list_ids)
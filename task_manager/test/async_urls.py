@@ -0,0 +1,11 @@
+from django.urls import include, path
+
+from task_manager import async_views
+
+# The project URLs with the read views swapped for their async versions, as with settings.ASYNC_READ_VIEWS.
+urlpatterns = [
+    path('task_lists/', async_views.AsyncTaskListView.as_view(), name='task_lists'),
+    path('task_list/<int:pk>/', async_views.AsyncTaskListDetailView.as_view(), name='view_task_list'),
+    path('calendar/events/', async_views.AsyncCalendarEventsView.as_view(), name='calendar_events'),
+    path('', include('gestionnaire_taches_project.urls')),
+]
@@ -1,10 +1,22 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from task_manager.models import TaskList
 
+# Tests get a cache of their own: the configured one is shared with the development server, and with the
+# other processes of a --parallel run.
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'KEY_PREFIX': 'task_manager',
+    },
+}
 
+
+@override_settings(CACHES=TEST_CACHES)
 class CommonSetUp(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', password='12345')
         self.other_user = User.objects.create_user(username='otheruser', email='otheruser@example.com',
                                                    password='67890')
@@ -0,0 +1,81 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .common_setup import CommonSetUp
+from task_manager.models import Category, Task, TaskList
+
+
+class ApiTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Work', created_by=self.user)
+        self.foreign_list = TaskList.objects.create(title='Foreign', created_by=self.other_user)
+
+    def create_task(self, title, task_list=None):
+        task = Task.objects.create(title=title, priority='Low', task_list=task_list or self.task_list,
+                                   category=self.category)
+        task.assigned_to.add(self.user)
+        return task
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get('/api/tasks/').status_code, 401)
+
+    def test_lists_only_accessible_task_lists(self):
+        shared = TaskList.objects.create(title='Shared', created_by=self.other_user)
+        shared.shared_with.add(self.user)
+        response = self.client.get('/api/task_lists/')
+        self.assertEqual({item['id'] for item in response.json()['results']}, {self.task_list.id, shared.id})
+
+    def test_task_list_query_count_is_constant(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get('/api/tasks/')
+            return len(queries)
+
+        self.create_task('First')
+        count_queries()
+        baseline = count_queries()
+        for index in range(10):
+            self.create_task(f'Task {index}')
+        self.assertEqual(count_queries(), baseline)
+
+    def test_cursor_pagination(self):
+        for index in range(5):
+            self.create_task(f'Task {index}')
+        self.create_task('Hidden', task_list=self.foreign_list)
+
+        seen = []
+        url = '/api/tasks/?page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            seen += [item['title'] for item in data['results']]
+            url = data['next']
+        self.assertEqual(seen, [f'Task {index}' for index in reversed(range(5))])
+
+    def test_sparse_fields(self):
+        self.create_task('Sparse')
+        response = self.client.get('/api/tasks/', {'fields': 'id,title'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+
+    def test_create_task_checks_list_access_and_members(self):
+        response = self.client.post('/api/tasks/', {'title': 'Nope', 'priority': 'Low',
+                                                    'task_list': self.foreign_list.id})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/tasks/', {'title': 'Nope', 'priority': 'Low',
+                                                    'task_list': self.task_list.id,
+                                                    'assigned_to': [self.other_user.id]})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/tasks/', {'title': 'Yes', 'priority': 'High',
+                                                    'task_list': self.task_list.id, 'category': self.category.id,
+                                                    'assigned_to': [self.user.id]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['category_name'], 'Work')
+
+    def test_foreign_task_is_not_found(self):
+        task = self.create_task('Hidden', task_list=self.foreign_list)
+        self.assertEqual(self.client.get(f'/api/tasks/{task.id}/').status_code, 404)
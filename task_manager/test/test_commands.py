@@ -0,0 +1,166 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .common_setup import CommonSetUp
+from task_manager.jobs import enqueue
+from task_manager.models import ArchivedTask, Category, Job, Task, TaskList
+
+
+class ExplainQueriesCommandTest(CommonSetUp):
+    def test_explains_each_view_queryset(self):
+        out = StringIO()
+        call_command('explain_queries', 'testuser', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Task list overview', output)
+        self.assertIn(f'Task list detail #{self.task_list.pk}', output)
+        self.assertIn('Calendar events', output)
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('explain_queries', 'nobody', stdout=StringIO())
+
+
+class RecountCommandTest(CommonSetUp):
+    def test_repairs_drifted_counters(self):
+        Task.objects.create(title='Open', priority='Low', task_list=self.task_list)
+        Task.objects.create(title='Done', priority='Low', completed=True, task_list=self.task_list)
+        TaskList.objects.filter(pk=self.task_list.pk).update(total_tasks=7, completed_tasks=0)
+
+        out = StringIO()
+        call_command('recount', stdout=out)
+        self.assertIn('1 had drifted', out.getvalue())
+        self.task_list.refresh_from_db()
+        self.assertEqual((self.task_list.total_tasks, self.task_list.completed_tasks), (2, 1))
+
+        out = StringIO()
+        call_command('recount', self.task_list.pk, stdout=out)
+        self.assertIn('0 had drifted', out.getvalue())
+
+
+class ArchiveTasksCommandTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(name='Work', created_by=self.user)
+        self.old_done = [
+            Task.objects.create(title=f'Old done {index}', priority='Low', completed=True, category=category,
+                                task_list=self.task_list)
+            for index in range(3)
+        ]
+        self.old_done[0].assigned_to.add(self.user, self.other_user)
+        self.old_open = Task.objects.create(title='Old open', priority='Low', task_list=self.task_list)
+        self.recent_done = Task.objects.create(title='Recent done', priority='Low', completed=True,
+                                               task_list=self.task_list)
+        Task.objects.exclude(pk=self.recent_done.pk).update(updated_at=timezone.now() - timedelta(days=100))
+
+    def test_archives_and_restores(self):
+        out = StringIO()
+        call_command('archive_tasks', days=30, batch_size=2, stdout=out)
+        self.assertIn('Archived 3 task(s)', out.getvalue())
+        self.assertQuerySetEqual(
+            Task.objects.order_by('id'), [self.old_open.pk, self.recent_done.pk], transform=lambda task: task.pk,
+        )
+        archived = ArchivedTask.objects.get(pk=self.old_done[0].pk)
+        self.assertEqual(archived.category.name, 'Work')
+        self.assertEqual(set(archived.assigned_to.all()), {self.user, self.other_user})
+        self.task_list.refresh_from_db()
+        self.assertEqual((self.task_list.total_tasks, self.task_list.completed_tasks), (2, 1))
+
+        out = StringIO()
+        call_command('archive_tasks', self.task_list.pk, restore=True, stdout=out)
+        self.assertIn('Restored 3 task(s)', out.getvalue())
+        self.assertFalse(ArchivedTask.objects.exists())
+        restored = Task.objects.get(pk=self.old_done[0].pk)
+        self.assertTrue(restored.completed)
+        self.assertEqual(set(restored.assigned_to.all()), {self.user, self.other_user})
+        self.task_list.refresh_from_db()
+        self.assertEqual((self.task_list.total_tasks, self.task_list.completed_tasks), (5, 4))
+
+        # Restored tasks start over, so they are not archived again straight away.
+        call_command('archive_tasks', days=30, stdout=StringIO())
+        self.assertFalse(ArchivedTask.objects.exists())
+
+    def test_restore_needs_task_lists(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_tasks', restore=True, stdout=StringIO())
+
+
+class RunJobsCommandTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.task_list.shared_with.add(self.other_user)
+        for index in range(5):
+            task = Task.objects.create(title=f'Task {index}', priority='Low', completed=index < 2,
+                                       task_list=self.task_list)
+            task.assigned_to.add(self.user)
+        Task.objects.filter(completed=True).update(updated_at=timezone.now() - timedelta(days=100))
+        call_command('archive_tasks', days=30, stdout=StringIO())
+
+    def test_deleted_list_is_hidden_then_purged(self):
+        self.client.post(reverse('delete_task_list', args=[self.task_list.pk]))
+        self.assertEqual(self.client.get(reverse('view_task_list', args=[self.task_list.pk])).status_code, 302)
+        self.assertNotContains(self.client.get(reverse('task_lists')), 'Test List')
+        self.assertTrue(TaskList.objects.filter(pk=self.task_list.pk, deleted_at__isnull=False).exists())
+        self.assertEqual(Task.objects.count(), 3)
+
+        out = StringIO()
+        with mock.patch('task_manager.purge.BATCH_SIZE', 2), CaptureQueriesContext(connection) as queries:
+            call_command('run_jobs', once=True, stdout=out)
+        self.assertIn('Ran 1 job(s), 0 failed', out.getvalue())
+        self.assertFalse(TaskList.objects.filter(pk=self.task_list.pk).exists())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertFalse(Task.assigned_to.through.objects.exists())
+        self.assertFalse(TaskList.shared_with.through.objects.exists())
+        self.assertFalse(Job.objects.exists())
+        # Rows and assignees of the three tasks in two batches, then of the two archived tasks, then the sharing
+        # rows and the list, and finally the job.
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 2 * 2 + 2 + 2 + 1)
+        # The batches load only ids; whole tasks are selected once, when deleting the list finds none left.
+        loaded = [query for query in queries if '"task_manager_task"."title"' in query['sql']]
+        self.assertEqual(len(loaded), 1)
+
+    def test_failed_job_is_retried_later(self):
+        job = enqueue('purge_task_list', task_list_id=self.task_list.pk)
+        with mock.patch('task_manager.purge.purge_task_list', side_effect=RuntimeError('boom')), \
+                self.assertLogs('task_manager.jobs', 'ERROR'):
+            call_command('run_jobs', once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.attempts, job.failed, job.last_error), (1, False, 'RuntimeError: boom'))
+        self.assertGreater(job.run_after, timezone.now())
+        # Not due yet.
+        call_command('run_jobs', once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+
+
+class SeedAndBenchmarkCommandTest(CommonSetUp):
+    def test_seed_data(self):
+        call_command('seed_data', users=5, lists=8, tasks=120, batch_size=50, stdout=StringIO())
+        self.assertEqual(TaskList.objects.filter(created_by__username__startswith='seed_').count(), 8)
+        self.assertEqual(Task.objects.count(), 120)
+        self.assertEqual(sum(TaskList.objects.values_list('total_tasks', flat=True)), 120)
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=5, lists=8, tasks=120, stdout=StringIO())
+
+    def test_benchmark_views_reports_json(self):
+        call_command('seed_data', users=3, lists=3, tasks=60, stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_views', iterations=2, warmup=0, include_writes=True, stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['meta']['iterations'], 2)
+        for name in ('home', 'task_lists', 'view_task_list', 'view_task_list:page_10', 'create_task:submit'):
+            self.assertIn(name, report['results'])
+            self.assertLess(report['results'][name]['status'], 400)
+            self.assertGreater(report['results'][name]['queries'], 0)
+        self.assertEqual(Task.objects.count(), 60)
@@ -0,0 +1,74 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from .common_setup import CommonSetUp
+from task_manager.bulk import apply_bulk_action
+from task_manager.events import InMemoryBroker, get_broker, task_list_channel
+from task_manager.models import Task, TaskList
+
+
+class InMemoryBrokerTest(TestCase):
+    async def test_fan_out(self):
+        broker = InMemoryBroker()
+        async with broker.subscribe('a') as first, broker.subscribe('a') as second, broker.subscribe('b') as other:
+            broker.publish('a', {'type': 'deleted', 'id': 1})
+            self.assertEqual(await asyncio.wait_for(first.get(), 1), {'type': 'deleted', 'id': 1})
+            self.assertEqual(await asyncio.wait_for(second.get(), 1), {'type': 'deleted', 'id': 1})
+            await asyncio.sleep(0)
+            self.assertTrue(other._queue.empty())
+        self.assertEqual(broker._subscriptions, {})
+
+    async def test_publish_from_another_thread(self):
+        broker = InMemoryBroker()
+        async with broker.subscribe('a') as subscription:
+            await sync_to_async(broker.publish, thread_sensitive=False)('a', {'type': 'updated', 'id': 1})
+            self.assertEqual(await asyncio.wait_for(subscription.get(), 1), {'type': 'updated', 'id': 1})
+
+    async def test_slow_consumer_is_told_to_reload(self):
+        broker = InMemoryBroker()
+        async with broker.subscribe('a') as subscription:
+            subscription.max_pending = 3
+            for task_id in range(5):
+                broker.publish('a', {'type': 'deleted', 'id': task_id})
+            await asyncio.sleep(0)
+            self.assertEqual(await subscription.get(), {'type': 'reload'})
+            self.assertEqual(await subscription.get(), {'type': 'deleted', 'id': 4})
+
+
+class TaskEventsTest(CommonSetUp):
+    def commit(self, change, execute=True):
+        # Commit hooks are registered on the connection of the thread running the ORM, not the event loop's.
+        with self.captureOnCommitCallbacks(execute=execute) as callbacks:
+            change()
+        return callbacks
+
+    async def collect(self, task_list, change, count):
+        async with get_broker().subscribe(task_list_channel(task_list.id)) as subscription:
+            await sync_to_async(self.commit)(change)
+            return [await asyncio.wait_for(subscription.get(), 1) for _ in range(count)]
+
+    async def test_bulk_actions(self):
+        tasks = [await Task.objects.acreate(title=f'Task {index}', priority='Low', task_list=self.task_list)
+                 for index in range(2)]
+        selection = Task.objects.filter(id__in=[task.id for task in tasks])
+        events = await self.collect(self.task_list, lambda: apply_bulk_action(selection, 'complete'), 2)
+        self.assertEqual(events, [{'type': 'completed', 'id': task.id, 'completed': True} for task in tasks])
+
+        other_list = await TaskList.objects.acreate(title='Other', created_by=self.user)
+        events = await self.collect(
+            other_list, lambda: apply_bulk_action(selection, 'move', target_task_list=other_list), 2,
+        )
+        self.assertEqual(events, [{'type': 'created', 'id': task.id} for task in tasks])
+
+    async def test_events_wait_for_the_commit(self):
+        async with get_broker().subscribe(task_list_channel(self.task_list.id)) as subscription:
+            callbacks = await sync_to_async(self.commit)(
+                lambda: Task.objects.create(title='Pending', priority='Low', task_list=self.task_list), execute=False,
+            )
+            await asyncio.sleep(0)
+            self.assertTrue(subscription._queue.empty())
+            for callback in callbacks:
+                await sync_to_async(callback)()
+            self.assertEqual((await asyncio.wait_for(subscription.get(), 1))['type'], 'created')
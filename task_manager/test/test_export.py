@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .common_setup import CommonSetUp
+from task_manager.models import Category, Task, TaskList
+from task_manager.views import ExportTaskListView
+
+
+class TaskExportTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.category = Category.objects.create(name='Work', created_by=self.user)
+        for index in range(5):
+            task = Task.objects.create(title=f'Task {index}', priority='Low', task_list=self.task_list,
+                                       category=self.category if index % 2 else None)
+            task.assigned_to.add(self.user, self.other_user)
+        foreign_list = TaskList.objects.create(title='Foreign', created_by=self.other_user)
+        Task.objects.create(title='Hidden', priority='Low', task_list=foreign_list)
+
+    def export(self, url_name, args=(), export_format='csv'):
+        response = self.client.get(reverse(url_name, args=args), {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('export_task_list', [self.task_list.id]))))
+        self.assertEqual([row['title'] for row in rows], [f'Task {index}' for index in range(5)])
+        self.assertEqual(rows[1]['category'], 'Work')
+        self.assertEqual(rows[0]['assigned_to'], 'testuser, otheruser')
+
+    def test_ndjson_export_of_all_accessible_lists(self):
+        rows = [json.loads(line) for line in self.export('export_tasks', export_format='ndjson').splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['assigned_to'], ['testuser', 'otheruser'])
+        self.assertEqual(rows[0]['task_list'], 'Test List')
+
+    def test_assignees_are_loaded_per_chunk(self):
+        with mock.patch.object(ExportTaskListView, 'export_chunk_size', 2):
+            with CaptureQueriesContext(connection) as queries:
+                self.export('export_task_list', [self.task_list.id])
+        assignee_queries = [query for query in queries if 'task_manager_task_assigned_to' in query['sql']]
+        self.assertEqual(len(assignee_queries), 3)
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('export_tasks'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from .common_setup import TEST_CACHES
 from task_manager.forms import TaskForm, TaskListForm, CategoryForm, UserRegistrationForm
 from task_manager.models import TaskList, User
 from django.utils import timezone
@@ -15,6 +16,7 @@ class TaskListFormTest(TestCase):
         self.assertEqual(len(form.errors), 1)
 
 
+@override_settings(CACHES=TEST_CACHES)
 class TaskFormTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='testuser', password='12345')
@@ -0,0 +1,117 @@
+import io
+import json
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .common_setup import CommonSetUp
+from task_manager.importer import import_tasks, read_rows
+from task_manager.models import Category, Task
+
+CSV_DATA = """title,description,deadline,priority,completed,category,assigned_to
+Write report,Quarterly,2024-05-01T10:00:00+00:00,High,False,Work,"testuser, otheruser"
+,Missing title,,Low,False,,
+Plan trip,,not a date,Urgent,False,Travel,stranger
+Call back,,,Low,True,,testuser
+"""
+
+
+class TaskImportTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.task_list.shared_with.add(self.other_user)
+        self.category = Category.objects.create(name='Work', created_by=self.user)
+
+    def import_csv(self, data=CSV_DATA, **kwargs):
+        return import_tasks(self.task_list, self.user, read_rows(io.StringIO(data), 'csv'), **kwargs)
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        report = self.import_csv()
+        self.assertEqual(report.created, 2)
+        self.assertEqual([line for line, _ in report.rejected], [3, 4])
+        self.assertEqual(set(report.rejected[1][1]), {'deadline', 'priority', 'category', 'assigned_to'})
+
+        task = Task.objects.get(title='Write report')
+        self.assertEqual(task.category, self.category)
+        self.assertEqual(set(task.assigned_to.values_list('username', flat=True)), {'testuser', 'otheruser'})
+        self.assertTrue(Task.objects.get(title='Call back').completed)
+        self.task_list.refresh_from_db()
+        self.assertEqual((self.task_list.total_tasks, self.task_list.completed_tasks), (2, 1))
+
+    def test_dry_run_saves_nothing(self):
+        report = self.import_csv(dry_run=True)
+        self.assertEqual(report.created, 2)
+        self.assertFalse(Task.objects.exists())
+
+    def test_query_count_is_per_batch(self):
+        rows = [{'title': f'Task {index}', 'priority': 'Low', 'category': 'Work', 'assigned_to': ['testuser']}
+                for index in range(50)]
+        with CaptureQueriesContext(connection) as queries:
+            report = import_tasks(self.task_list, self.user, enumerate(rows, start=1), batch_size=25)
+        self.assertEqual(report.created, 50)
+        category_queries = [query for query in queries if 'FROM "task_manager_category"' in query['sql']]
+        self.assertEqual(len(category_queries), 2)
+        self.assertLess(len(queries), 20)
+
+    def test_command_reads_ndjson(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson') as handle:
+            handle.write(json.dumps({'title': 'From file', 'priority': 'Medium'}) + '\n')
+            handle.flush()
+            out = io.StringIO()
+            call_command('import_tasks', self.task_list.id, handle.name, stdout=out, stderr=io.StringIO())
+        self.assertIn('1 task(s) imported', out.getvalue())
+        self.assertTrue(Task.objects.filter(title='From file', task_list=self.task_list).exists())
+
+    def test_upload_view(self):
+        self.client.login(username='testuser', password='12345')
+        upload = SimpleUploadedFile('tasks.csv', CSV_DATA.encode(), content_type='text/csv')
+        response = self.client.post(reverse('import_tasks', args=[self.task_list.id]), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['report'].rejected), 2)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_rows_that_are_not_objects_are_rejected(self):
+        data = json.dumps([1, ['x'], {'title': 'Kept', 'priority': 'Low'}, 'title'])
+        report = import_tasks(self.task_list, self.user, read_rows(io.StringIO(data), 'json'))
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _ in report.rejected], [1, 2, 4])
+        self.assertEqual(list(report.rejected[0][1]), ['row'])
+
+    def test_non_string_assignees_are_reported(self):
+        rows = [{'title': 'Numbers', 'priority': 'Low', 'assigned_to': [1]},
+                {'title': 'Number', 'priority': 'Low', 'assigned_to': 2}]
+        report = import_tasks(self.task_list, self.user, enumerate(rows, start=1))
+        self.assertEqual(report.created, 0)
+        self.assertEqual(report.rejected, [(1, {'assigned_to': ['Not a member of this list: 1.']}),
+                                           (2, {'assigned_to': ['Not a member of this list: 2.']})])
+
+    def test_upload_view_rejects_a_json_object(self):
+        self.client.login(username='testuser', password='12345')
+        upload = SimpleUploadedFile('tasks.json', json.dumps({'title': 'Task', 'priority': 'Low'}).encode())
+        response = self.client.post(reverse('import_tasks', args=[self.task_list.id]), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must be an array', str(response.context['form'].errors['file']))
+        self.assertFalse(Task.objects.exists())
+
+    def test_unparsable_ndjson_lines_are_rejected(self):
+        data = '{"title": "First", "priority": "Low"}\n{"title": oops}\n{"title": "Third", "priority": "Low"}\n'
+        report = import_tasks(self.task_list, self.user, read_rows(io.StringIO(data), 'ndjson'), batch_size=1)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([line for line, _ in report.rejected], [2])
+        self.assertIn('Invalid JSON', report.rejected[0][1]['row'][0])
+
+    def test_read_error_after_the_first_batch_is_reported(self):
+        # Past the first chunk the text stream decodes, so the first batch is saved by then.
+        lines = [json.dumps({'title': f'Task {index}', 'priority': 'Low'}) for index in range(300)]
+        data = '\n'.join(lines).encode() + b'\n\xff\n'
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+        report = import_tasks(self.task_list, self.user, read_rows(stream, 'ndjson'), batch_size=100)
+        self.assertGreater(report.created, 0)
+        self.assertEqual(report.created, Task.objects.count())
+        [(line, errors)] = report.rejected
+        self.assertEqual(line, report.created + 1)
+        self.assertIn('Could not read the rest of the file', errors['file'][0])
@@ -1,6 +1,8 @@
 from django.utils import timezone
 from .common_setup import CommonSetUp
+from task_manager.bulk import apply_bulk_action, toggle_completed
 from task_manager.models import Task, TaskList
+from task_manager.purge import soft_delete_task_list
 
 
 class TaskListAndTaskModelTest(CommonSetUp):
@@ -20,3 +22,92 @@ class TaskListAndTaskModelTest(CommonSetUp):
         self.assertTrue(isinstance(task, Task))
         self.assertEqual(str(task), "Test Task")
         self.assertFalse(task.is_overdue())
+
+    def test_updated_at_follows_related_changes(self):
+        task = Task.objects.create(title="Test Task", priority="Medium", task_list=self.task_list)
+        self.task_list.refresh_from_db()
+        self.assertGreaterEqual(self.task_list.updated_at, task.updated_at)
+
+        for change in (lambda: task.assigned_to.add(self.user),
+                       lambda: self.task_list.shared_with.add(self.other_user),
+                       lambda: apply_bulk_action(Task.objects.filter(id=task.id), 'complete')):
+            task_updated_at, task_list_updated_at = task.updated_at, self.task_list.updated_at
+            change()
+            task.refresh_from_db()
+            self.task_list.refresh_from_db()
+            self.assertGreater(self.task_list.updated_at, task_list_updated_at)
+        self.assertGreater(task.updated_at, task_updated_at)
+
+
+class TaskCountersTest(CommonSetUp):
+    def assertCounters(self, task_list, total, completed):
+        task_list.refresh_from_db()
+        self.assertEqual((task_list.total_tasks, task_list.completed_tasks), (total, completed))
+
+    def create_task(self, **kwargs):
+        return Task.objects.create(title="Task", priority="Low", task_list=self.task_list, **kwargs)
+
+    def test_save_and_delete(self):
+        task = self.create_task()
+        self.create_task(completed=True)
+        self.assertCounters(self.task_list, 2, 1)
+        self.assertEqual(self.task_list.not_completed_tasks, 1)
+
+        task.completed = True
+        task.save()
+        self.assertCounters(self.task_list, 2, 2)
+
+        other_list = TaskList.objects.create(title="Other", created_by=self.user)
+        task.task_list = other_list
+        task.save()
+        self.assertCounters(self.task_list, 1, 1)
+        self.assertCounters(other_list, 1, 1)
+
+        task.delete()
+        self.assertCounters(other_list, 0, 0)
+
+    def test_save_after_a_concurrent_toggle(self):
+        task = self.create_task()
+        stale_copies = [Task.objects.get(pk=task.pk) for _ in range(3)]
+        toggle_completed(self.task_list, task.pk)
+        self.assertCounters(self.task_list, 1, 1)
+
+        # Saving what was already written does not count the completion twice.
+        stale_copies[0].completed = True
+        stale_copies[0].save()
+        self.assertCounters(self.task_list, 1, 1)
+        # Writing back the state loaded before the toggle undoes it.
+        stale_copies[1].save()
+        self.assertCounters(self.task_list, 1, 0)
+        toggle_completed(self.task_list, task.pk)
+        stale_copies[2].delete()
+        self.assertCounters(self.task_list, 0, 0)
+
+    def test_saving_a_stale_list_keeps_its_counters(self):
+        stale = TaskList.objects.get(pk=self.task_list.pk)
+        self.create_task()
+        self.create_task(completed=True)
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertCounters(self.task_list, 2, 1)
+        self.assertEqual(self.task_list.title, 'Renamed')
+
+        soft_delete_task_list(self.task_list)
+        stale.save()
+        self.assertIsNotNone(TaskList.objects.get(pk=stale.pk).deleted_at)
+
+    def test_bulk_actions(self):
+        tasks = [self.create_task() for _ in range(3)]
+        selection = Task.objects.filter(id__in=[task.id for task in tasks[:2]])
+
+        apply_bulk_action(selection, 'complete')
+        apply_bulk_action(selection, 'complete')
+        self.assertCounters(self.task_list, 3, 2)
+
+        other_list = TaskList.objects.create(title="Other", created_by=self.user)
+        apply_bulk_action(Task.objects.filter(id__in=[tasks[1].id, tasks[2].id]), 'move', target_task_list=other_list)
+        self.assertCounters(self.task_list, 1, 1)
+        self.assertCounters(other_list, 2, 1)
+
+        apply_bulk_action(Task.objects.filter(task_list=other_list), 'delete')
+        self.assertCounters(other_list, 0, 0)
@@ -1,5 +1,18 @@
+from unittest import mock
+
+from django.contrib.auth import BACKEND_SESSION_KEY, authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework.test import APIClient
 from .common_setup import CommonSetUp
+from django.contrib.auth.models import User
+from task_manager.bulk import apply_bulk_action
+from task_manager.caching import get_accessible_task_list_ids, get_cached_user, get_task_list_member_ids, \
+    get_visible_categories, user_key
+from task_manager.models import Category, Task, TaskList
 
 
 class TaskListPermissionsTest(CommonSetUp):
@@ -18,3 +31,168 @@ class TaskListPermissionsTest(CommonSetUp):
         self.client.login(username='otheruser', password='67890')
         response = self.client.get(reverse('task_lists'))
         self.assertNotContains(response, self.task_list.title)
+
+
+class TaskListAccessCacheTest(CommonSetUp):
+    def test_sharing_changes_invalidate_access(self):
+        self.client.login(username='otheruser', password='67890')
+        url = reverse('view_task_list', args=[self.task_list.id])
+        self.assertNotEqual(self.client.get(url).status_code, 200)
+
+        self.task_list.shared_with.add(self.other_user)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.task_list.shared_with.clear()
+        self.assertNotEqual(self.client.get(url).status_code, 200)
+
+        self.other_user.shared_task_lists.add(self.task_list)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_accessible_ids_are_cached_until_lists_change(self):
+        self.assertEqual(get_accessible_task_list_ids(self.user), {self.task_list.id})
+        with self.assertNumQueries(0):
+            get_accessible_task_list_ids(self.user)
+
+        new_list = TaskList.objects.create(title='Second List', created_by=self.user)
+        self.assertEqual(get_accessible_task_list_ids(self.user), {self.task_list.id, new_list.id})
+
+        new_list.delete()
+        self.assertEqual(get_accessible_task_list_ids(self.user), {self.task_list.id})
+
+    def test_create_task_resolves_list_once(self):
+        self.client.login(username='testuser', password='12345')
+        url = reverse('create_task', args=[self.task_list.id])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        task_list_lookups = [query for query in queries if 'FROM "task_manager_tasklist"' in query['sql']]
+        self.assertEqual(len(task_list_lookups), 1)
+
+
+class TaskListMembersTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.stranger = User.objects.create_user(username='stranger', password='secret')
+
+    def test_assignee_filter_lists_only_members(self):
+        self.task_list.shared_with.add(self.other_user)
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('view_task_list', args=[self.task_list.id]))
+        self.assertEqual(set(response.context['users']), {self.user, self.other_user})
+        self.assertNotContains(response, 'stranger')
+
+    def test_member_ids_are_cached_until_sharing_changes(self):
+        self.assertEqual(get_task_list_member_ids(self.task_list), {self.user.id})
+        with self.assertNumQueries(0):
+            get_task_list_member_ids(self.task_list)
+
+        self.task_list.shared_with.add(self.stranger)
+        self.assertEqual(get_task_list_member_ids(self.task_list), {self.user.id, self.stranger.id})
+
+        self.stranger.shared_task_lists.clear()
+        self.assertEqual(get_task_list_member_ids(self.task_list), {self.user.id})
+
+
+class VisibleCategoriesTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.task_list.shared_with.add(self.other_user)
+        self.mine = Category.objects.create(name='Mine', created_by=self.user)
+        self.theirs = Category.objects.create(name='Theirs', created_by=self.other_user)
+        self.unused = Category.objects.create(name='Unused', created_by=self.other_user)
+        self.task = Task.objects.create(title='Task', priority='Low', task_list=self.task_list)
+
+    def assertVisible(self, user, categories):
+        self.assertEqual(set(get_visible_categories(user, [self.task_list.pk])), set(categories))
+
+    def test_own_and_list_categories_in_one_query(self):
+        self.assertVisible(self.user, [self.mine])
+        self.task.category = self.theirs
+        self.task.save()
+        self.assertVisible(self.user, [self.mine, self.theirs])
+        with self.assertNumQueries(1):
+            list(get_visible_categories(self.user, [self.task_list.pk]))
+
+        apply_bulk_action(Task.objects.filter(pk=self.task.pk), 'set_category', category=self.mine)
+        self.assertVisible(self.user, [self.mine])
+        self.assertVisible(self.other_user, [self.mine, self.theirs, self.unused])
+
+        self.mine.delete()
+        self.assertVisible(self.other_user, [self.theirs, self.unused])
+
+    def test_form_offers_visible_categories(self):
+        self.task.category = self.theirs
+        self.task.save()
+        self.client.login(username='testuser', password='12345')
+        for url in (reverse('create_task', args=[self.task_list.pk]),
+                    reverse('update_task', args=[self.task_list.pk, self.task.pk])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(set(response.context['form'].fields['category'].queryset), {self.mine, self.theirs})
+                self.assertNotContains(response, 'Unused')
+
+
+class SessionUserCacheTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_session_and_user_come_from_the_cache(self):
+        self.count_queries(reverse('home'))
+        self.assertEqual(self.count_queries(reverse('home')), 0)
+
+    def test_password_hash_is_not_cached(self):
+        self.count_queries(reverse('home'))
+        data = cache.get(user_key(self.user.pk))
+        self.assertNotIn('password', data['fields'])
+        self.assertNotIn(self.user.password, str(data))
+        # Saving the request user leaves its password alone.
+        user = get_cached_user(self.user.pk)
+        user.first_name = 'Test'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('12345'))
+
+    def test_sessions_of_the_default_backend_stay_valid(self):
+        session = self.client.session
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session.save()
+        self.assertEqual(self.client.get(reverse('task_lists')).status_code, 200)
+
+    def test_failed_login_checks_the_password_once(self):
+        with mock.patch('django.contrib.auth.backends.ModelBackend.authenticate', autospec=True,
+                        side_effect=ModelBackend.authenticate) as model_authenticate:
+            self.assertIsNone(authenticate(username='testuser', password='wrong'))
+            self.assertEqual(authenticate(username='testuser', password='12345'), self.user)
+        self.assertEqual(model_authenticate.call_count, 2)
+
+    def test_password_change_signs_sessions_out(self):
+        self.count_queries(reverse('task_lists'))
+        self.user.set_password('new password')
+        self.user.save()
+        response = self.client.get(reverse('task_lists'))
+        self.assertRedirects(response, f'/accounts/login/?next={reverse("task_lists")}')
+
+    def test_deactivated_user_is_signed_out(self):
+        self.count_queries(reverse('task_lists'))
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        response = self.client.get(reverse('task_lists'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_jwt_user_comes_from_the_cache(self):
+        token = self.client.post(reverse('token_obtain_pair'), {'username': 'testuser', 'password': '12345'})
+        api = APIClient(headers={'Authorization': f"Bearer {token.json()['access']}"})
+        api.get('/api/task_lists/')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(api.get('/api/task_lists/').status_code, 200)
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT "auth_user"')])
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(api.get('/api/task_lists/').status_code, 401)
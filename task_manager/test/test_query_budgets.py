@@ -0,0 +1,179 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from django.urls import URLResolver, resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .common_setup import CommonSetUp
+from task_manager import urls, views
+from task_manager.middleware import QueryBudgetExceeded, get_query_budget
+from task_manager.models import ArchivedTask, Category, Task
+
+IMPORT_CSV = 'title,priority,category,assigned_to\nImported,Low,Work,"testuser, otheruser"\n'
+
+
+def iter_url_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(pattern.url_patterns)
+        else:
+            yield pattern.name
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetTest(CommonSetUp):
+    """Every URL of the app declares a query budget, which holds on a list with several tasks."""
+
+    def setUp(self):
+        super().setUp()
+        self.task_list.shared_with.add(self.other_user)
+        self.category = Category.objects.create(name='Work', created_by=self.user)
+        self.spare_category = Category.objects.create(name='Spare', created_by=self.user)
+        now = timezone.now()
+        self.tasks = []
+        for index in range(10):
+            task = Task.objects.create(title=f'Task {index}', description='Task description', priority='Low',
+                                       deadline=now + timedelta(days=index), task_list=self.task_list,
+                                       category=self.category)
+            task.assigned_to.add(self.user, self.other_user)
+            self.tasks.append(task)
+        # Archived tasks keep the id of their task; stay clear of the ids of the tasks the requests create.
+        self.archived_task = ArchivedTask.objects.create(id=self.tasks[-1].id + 1000, title='Archived',
+                                                         priority='Low', task_list=self.task_list, updated_at=now)
+        self.archived_task.assigned_to.add(self.user)
+
+        self.client = APIClient()
+        self.client.login(username='testuser', password='12345')
+        self.client.force_authenticate(self.user)
+
+    def get_requests(self):
+        """(url name, method, args, data) of the requests to check, in the order they are sent."""
+        task_list_id, task_id, category_id = self.task_list.id, self.tasks[0].id, self.category.id
+        now = timezone.now()
+        task_data = {'title': 'Budget task', 'description': 'Task description', 'priority': 'High',
+                     'deadline': (now + timedelta(days=3)).strftime('%Y-%m-%dT%H:%M'),
+                     'assigned_to': [self.user.id, self.other_user.id], 'category': category_id}
+        upload = SimpleUploadedFile('tasks.csv', IMPORT_CSV.encode(), content_type='text/csv')
+        return [
+            ('task_lists', 'get', [], {}),
+            ('create_task_list', 'get', [], {}),
+            ('view_task_list', 'get', [task_list_id], {'completed': 'All'}),
+            ('update_task_list', 'get', [task_list_id], {}),
+            ('delete_task_list', 'get', [task_list_id], {}),
+            ('share_task_list', 'get', [task_list_id], {}),
+            ('export_task_list', 'get', [task_list_id], {'format': 'csv'}),
+            ('import_tasks', 'get', [task_list_id], {}),
+            ('import_tasks', 'post', [task_list_id], {'file': upload}),
+            ('task_list_events', 'get', [task_list_id], {}),
+            ('export_tasks', 'get', [], {'format': 'ndjson'}),
+            ('home', 'get', [], {}),
+            ('search_tasks', 'get', [], {'q': 'task'}),
+            ('calendar_events', 'get', [], {'start': now.isoformat(),
+                                            'end': (now + timedelta(days=30)).isoformat()}),
+            ('register', 'get', [], {}),
+            ('login', 'get', [], {}),
+            ('create_task', 'get', [task_list_id], {}),
+            ('create_task', 'post', [task_list_id], task_data),
+            ('update_task', 'get', [task_list_id, task_id], {}),
+            ('update_task', 'post', [task_list_id, task_id], task_data),
+            ('delete_task', 'get', [task_list_id, task_id], {}),
+            ('mark_task_completed', 'post', [task_list_id, task_id], {}),
+            ('restore_archived_task', 'post', [task_list_id, self.archived_task.id], {}),
+            ('bulk_task_action', 'post', [task_list_id], {'action': 'complete',
+                                                          'tasks': [task.id for task in self.tasks]}),
+            ('bulk_task_action', 'post', [task_list_id], {'action': 'assign', 'assigned_to': [self.other_user.id],
+                                                          'tasks': [task.id for task in self.tasks]}),
+            ('bulk_task_action', 'post', [task_list_id], {'action': 'delete',
+                                                          'tasks': [task.id for task in self.tasks[5:]]}),
+            ('create_category', 'get', [], {}),
+            ('update_category', 'get', [category_id], {}),
+            ('delete_category', 'get', [category_id], {}),
+            ('category_list', 'get', [], {}),
+            ('api-root', 'get', [], {}),
+            ('api-task-list-list', 'get', [], {}),
+            ('api-task-list-list', 'post', [], {'title': 'Budget list'}),
+            ('api-task-list-detail', 'get', [task_list_id], {}),
+            ('api-task-list-detail', 'patch', [task_list_id], {'title': 'Renamed list'}),
+            ('api-task-list', 'get', [], {}),
+            ('api-task-list', 'post', [], {**task_data, 'deadline': (now + timedelta(days=3)).isoformat(),
+                                           'task_list': task_list_id}),
+            ('api-task-detail', 'get', [task_id], {}),
+            ('api-task-detail', 'patch', [task_id], {'title': 'Renamed task'}),
+            ('api-task-detail', 'delete', [self.tasks[1].id], {}),
+            ('api-category-list', 'get', [], {}),
+            ('api-category-list', 'post', [], {'name': 'Budget category'}),
+            ('api-category-detail', 'get', [category_id], {}),
+            ('api-category-detail', 'patch', [category_id], {'name': 'Renamed category'}),
+            ('api-category-detail', 'delete', [self.spare_category.id], {}),
+            ('django.contrib.sitemaps.views.sitemap', 'get', [], {}),
+            ('robots_txt', 'get', [], {}),
+            # Remove the category and the list the requests above use.
+            ('delete_category', 'post', [category_id], {}),
+            ('api-task-list-detail', 'delete', [task_list_id], {}),
+            # Last, since it ends the session.
+            ('logout', 'get', [], {}),
+        ]
+
+    def test_every_url_is_covered(self):
+        self.assertEqual(set(iter_url_names(urls.urlpatterns)), {name for name, *_ in self.get_requests()})
+
+    def test_views_stay_within_their_budget(self):
+        for name, method, args, data in self.get_requests():
+            with self.subTest(url=name, method=method):
+                url = reverse(name, args=args)
+                self.assertIsNotNone(get_query_budget(resolve(url).func, method.upper()),
+                                     f'{name} declares no {method.upper()} query_budget')
+                response = getattr(self.client, method)(url, data)
+                self.assertLess(response.status_code, 400)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+    def test_anonymous_login_and_signup_stay_within_their_budget(self):
+        # As for a visitor: no session yet and nothing cached about them.
+        requests = [
+            ('login', {'username': 'testuser', 'password': '12345'}),
+            ('register', {'username': 'budgetuser', 'email': 'budgetuser@example.com',
+                          'password1': 'Budget-Pass-123', 'password2': 'Budget-Pass-123'}),
+        ]
+        for name, data in requests:
+            with self.subTest(url=name):
+                cache.clear()
+                response = Client().post(reverse(name), data)
+                self.assertEqual(response.status_code, 302)
+
+
+class QueryInstrumentationMiddlewareTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+
+    def test_server_timing_header(self):
+        # Loading the user; the session was cached when it was created.
+        response = self.client.get(reverse('home'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="1 queries", app;dur=[\d.]+$')
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_overrun_raises_when_enforced(self):
+        with mock.patch.object(views.HomeView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('home'))
+
+    @override_settings(QUERY_BUDGET_ENFORCE=False)
+    def test_overrun_logs_a_warning_otherwise(self):
+        with mock.patch.object(views.HomeView, 'query_budget', 0):
+            with self.assertLogs('task_manager.performance', 'WARNING') as logs:
+                response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('over its budget of 0', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_budget_per_method(self):
+        with mock.patch.object(views.LoginView, 'query_budget', {'GET': 3, 'POST': 0}):
+            self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+            self.assertEqual(get_query_budget(resolve(reverse('login')).func, 'HEAD'), 3)
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.post(reverse('login'), {'username': 'testuser', 'password': '12345'})
@@ -0,0 +1,69 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from task_manager.middleware import ReplicaRoutingMiddleware
+from task_manager.models import TaskList
+from task_manager.routers import STICKY_COOKIE_NAME, cache_timeout
+
+
+@override_settings(DATABASE_REPLICA='replica', DATABASE_REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTest(SimpleTestCase):
+    def route(self, method='get', cookies=None, use_replica=True, write=False):
+        seen = {}
+
+        def view(request):
+            seen['task_list'] = router.db_for_read(TaskList)
+            seen['user'] = router.db_for_read(User)
+            seen['cache_timeout'] = cache_timeout(300)
+            if write:
+                seen['write'] = router.db_for_write(TaskList)
+            return HttpResponse()
+        view.use_replica = use_replica
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        return seen, middleware(request)
+
+    def test_get_reads_from_the_replica(self):
+        seen, response = self.route()
+        self.assertEqual(seen['task_list'], 'replica')
+        self.assertEqual(seen['user'], 'default')
+        self.assertEqual(seen['cache_timeout'], 10)
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+        self.assertEqual(router.db_for_read(TaskList), 'default')
+
+    def test_other_requests_use_the_primary(self):
+        self.assertEqual(self.route(method='post')[0]['task_list'], 'default')
+        self.assertEqual(self.route(use_replica=False)[0]['task_list'], 'default')
+        self.assertEqual(self.route(cookies={STICKY_COOKIE_NAME: '1'})[0]['task_list'], 'default')
+        with self.settings(DATABASE_REPLICA=None):
+            seen, response = self.route(write=True)
+        self.assertEqual(seen['task_list'], 'default')
+        self.assertNotIn(STICKY_COOKIE_NAME, response.cookies)
+
+    def test_writes_stick_to_the_primary(self):
+        seen, response = self.route(method='post', write=True)
+        self.assertEqual(seen['write'], 'default')
+        self.assertEqual(response.cookies[STICKY_COOKIE_NAME]['max-age'], 10)
+        self.assertEqual(seen['cache_timeout'], 300)
+
+    async def test_async_views(self):
+        async def view(request):
+            return HttpResponse(await sync_to_async(router.db_for_read)(TaskList))
+        view.use_replica = True
+
+        async def get_response(request):
+            await sync_to_async(middleware.process_view)(request, view, (), {})
+            return await view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = await middleware(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'replica')
@@ -0,0 +1,33 @@
+from django.urls import reverse
+
+from .common_setup import CommonSetUp
+from task_manager.models import Task, TaskList
+from task_manager.search import add_highlights, search_tasks
+
+
+class TaskSearchTest(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.in_title = Task.objects.create(title='Prepare invoice', priority='Low', task_list=self.task_list)
+        self.in_description = Task.objects.create(title='Accounting', description='Send the invoice to <b>ACME</b>',
+                                                  priority='Low', task_list=self.task_list)
+        Task.objects.create(title='Unrelated', priority='Low', task_list=self.task_list)
+        foreign_list = TaskList.objects.create(title='Foreign', created_by=self.other_user)
+        Task.objects.create(title='Foreign invoice', priority='Low', task_list=foreign_list)
+
+    def test_title_matches_rank_first_and_access_is_scoped(self):
+        results = list(search_tasks(self.user, 'invoice'))
+        self.assertEqual(results, [self.in_title, self.in_description])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(list(search_tasks(self.user, 'invoice acme')), [self.in_description])
+
+    def test_highlights_are_escaped(self):
+        task = add_highlights(list(search_tasks(self.user, 'acme')), 'acme')[0]
+        self.assertEqual(task.snippet, 'Send the invoice to &lt;b&gt;<mark>ACME</mark>&lt;/b&gt;')
+
+    def test_search_view(self):
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('search_tasks'), {'q': 'invoice'})
+        self.assertContains(response, 'Prepare <mark>invoice</mark>', html=False)
+        self.assertNotContains(response, 'Foreign invoice')
@@ -1,8 +1,22 @@
-from django.test import Client
-from django.contrib.auth.models import User
+import asyncio
+import re
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import Group, User
 from django.urls import reverse
+from django.utils import timezone
 from .common_setup import CommonSetUp
-from task_manager.models import Category, TaskList
+from task_manager.async_views import AsyncTaskListView, TaskListEventsView
+from task_manager.archive import archive_completed_tasks
+from task_manager.models import ArchivedTask, Category, Task, TaskList
+from task_manager.pagination import KeysetPaginator
 
 
 class ViewTestCase(CommonSetUp):
@@ -22,6 +36,86 @@ class ViewTestCase(CommonSetUp):
         self.assertContains(response, "New List")
 
 
+class TaskListOverviewTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+
+    def test_counters_are_annotated(self):
+        now = timezone.now()
+        Task.objects.create(title='Done', priority='Low', completed=True, task_list=self.task_list)
+        Task.objects.create(title='Late', priority='Low', deadline=now - timedelta(days=1), task_list=self.task_list)
+        Task.objects.create(title='Open', priority='Low', deadline=now + timedelta(days=1), task_list=self.task_list)
+        self.task_list.shared_with.add(self.other_user)
+
+        response = self.client.get(reverse('task_lists'))
+        task_list = response.context['task_lists'].get(id=self.task_list.id)
+        self.assertEqual(task_list.total_tasks, 3)
+        self.assertEqual(task_list.completed_tasks, 1)
+        self.assertEqual(task_list.not_completed_tasks, 2)
+        self.assertEqual(task_list.overdue_tasks, 1)
+
+    def test_query_count_does_not_grow_with_lists(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('task_lists'))
+            return len(queries)
+
+        self.client.get(reverse('home'))  # Caches the session user, which the baseline would count otherwise.
+        baseline = count_queries()
+        for index in range(20):
+            owned = TaskList.objects.create(title=f'Owned {index}', created_by=self.user)
+            Task.objects.create(title='Task', priority='Low', task_list=owned)
+            shared = TaskList.objects.create(title=f'Shared {index}', created_by=self.other_user)
+            shared.shared_with.add(self.user)
+        self.assertEqual(count_queries(), baseline)
+
+
+class CalendarEventsTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.category = Category.objects.create(name='Work', created_by=self.user)
+        self.now = timezone.now()
+
+    def create_task(self, title, deadline, **kwargs):
+        task = Task.objects.create(title=title, priority='High', deadline=deadline, task_list=self.task_list,
+                                   category=self.category, **kwargs)
+        task.assigned_to.add(self.user)
+        return task
+
+    def get_events(self, start, end):
+        return self.client.get(reverse('calendar_events'), {'start': start.isoformat(), 'end': end.isoformat()})
+
+    def test_returns_only_tasks_in_window(self):
+        inside = self.create_task('Inside', self.now + timedelta(days=1))
+        self.create_task('Outside', self.now + timedelta(days=40))
+        self.create_task('Done', self.now + timedelta(days=1), completed=True)
+
+        response = self.get_events(self.now, self.now + timedelta(days=7))
+        self.assertEqual(response.status_code, 200)
+        events = response.json()
+        self.assertEqual([event['id'] for event in events], [inside.id])
+        self.assertEqual(events[0]['extendedProps']['category'], 'Work')
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.get_events(self.now, self.now + timedelta(days=30))
+            return len(queries)
+
+        self.create_task('First', self.now + timedelta(days=1))
+        self.client.get(reverse('home'))  # Caches the session user, which the baseline would count otherwise.
+        baseline = count_queries()
+        for index in range(10):
+            self.create_task(f'Task {index}', self.now + timedelta(days=index + 1))
+        self.assertEqual(count_queries(), baseline)
+
+    def test_requires_valid_range(self):
+        response = self.client.get(reverse('calendar_events'), {'start': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
 class UserAuthenticationTestCase(CommonSetUp):
     def test_user_registration(self):
         response = self.client.post(reverse('register'), {
@@ -70,8 +164,503 @@ class ShareTaskListTestCase(CommonSetUp):
     def test_share_task_list(self):
         self.client.login(username='testuser', password='12345')
         response = self.client.post(reverse('share_task_list', args=[self.task_list.id]),
-                                    {'email': self.other_user.email})
+                                    {'emails': self.other_user.email})
         self.assertEqual(response.status_code, 302, msg="Expected redirection after successful sharing")
         updated_task_list = TaskList.objects.get(id=self.task_list.id)
         self.assertTrue(updated_task_list.shared_with.filter(username='otheruser').exists(),
                         msg="User should have been added to shared_with")
+
+    def test_share_with_many_emails_and_a_group(self):
+        team = Group.objects.create(name='Team')
+        team.user_set.add(self.user)
+        members = [User.objects.create_user(username=f'member{index}', email=f'member{index}@example.com')
+                   for index in range(3)]
+        team.user_set.add(*members)
+        self.task_list.shared_with.add(self.other_user)
+        # Caches what the new member can open before the list is shared with them.
+        self.client.force_login(members[1])
+        self.client.get(reverse('task_lists'))
+
+        self.client.login(username='testuser', password='12345')
+        url = reverse('share_task_list', args=[self.task_list.id])
+        emails = 'otheruser@example.com, member0@example.com;nobody@example.com\nmember0@EXAMPLE.com'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'emails': emails, 'group': team.pk}, follow=True)
+        self.assertEqual(set(self.task_list.shared_with.all()), {self.other_user, *members})
+        self.assertContains(response, 'List shared with 3 user(s).')
+        self.assertContains(response, '1 user(s) already had access.')
+        self.assertContains(response, 'No user found for: nobody@example.com.')
+        inserts = [query for query in queries if 'INTO "task_manager_tasklist_shared_with"' in query['sql']]
+        self.assertEqual(len(inserts), 1)
+
+        self.client.force_login(members[1])
+        self.assertEqual(self.client.get(reverse('view_task_list', args=[self.task_list.id])).status_code, 200)
+
+    def test_share_needs_valid_recipients(self):
+        self.client.login(username='testuser', password='12345')
+        url = reverse('share_task_list', args=[self.task_list.id])
+        self.assertContains(self.client.post(url, {'emails': 'not-an-email, otheruser@example.com'}),
+                            'Not valid email addresses: not-an-email.')
+        self.assertContains(self.client.post(url, {'emails': ''}), 'Enter at least one email address')
+        # Groups the user is not a member of are not offered.
+        other_group = Group.objects.create(name='Other')
+        self.assertContains(self.client.post(url, {'group': other_group.pk}), 'Select a valid choice')
+        self.assertFalse(self.task_list.shared_with.exists())
+
+
+class TaskListPaginationTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        now = timezone.now()
+        deadlines = [now + timedelta(days=3), now + timedelta(days=1), None, now + timedelta(days=1),
+                     now + timedelta(days=2), None, now + timedelta(days=4)]
+        self.tasks = [
+            Task.objects.create(title=f'Task {index}', priority='Low', deadline=deadline, task_list=self.task_list)
+            for index, deadline in enumerate(deadlines)
+        ]
+        self.url = reverse('view_task_list', args=[self.task_list.id])
+
+    def expected_ids(self, descending=False):
+        dated = sorted((task for task in self.tasks if task.deadline), key=lambda task: (task.deadline, task.id),
+                       reverse=descending)
+        undated = sorted((task for task in self.tasks if not task.deadline), key=lambda task: task.id,
+                         reverse=descending)
+        return [task.id for task in dated + undated]
+
+    def walk(self, params):
+        pages = []
+        response = self.client.get(self.url, params)
+        pages.append(response.context['page'])
+        while pages[-1].has_next:
+            response = self.client.get(self.url, {**params, 'cursor': pages[-1].next_cursor})
+            pages.append(response.context['page'])
+        return pages
+
+    def test_pages_follow_deadline_then_id(self):
+        pages = self.walk({'page_size': 3})
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([task.id for page in pages for task in page], self.expected_ids())
+        self.assertFalse(pages[0].has_previous)
+
+    def test_descending_sort(self):
+        pages = self.walk({'page_size': 2, 'sort': '-deadline'})
+        self.assertEqual([task.id for page in pages for task in page], self.expected_ids(descending=True))
+
+    def test_previous_cursor_returns_prior_page(self):
+        pages = self.walk({'page_size': 3})
+        response = self.client.get(self.url, {'page_size': 3, 'cursor': pages[-1].previous_cursor})
+        page = response.context['page']
+        self.assertEqual([task.id for task in page], [task.id for task in pages[1]])
+        self.assertTrue(page.has_next)
+
+    def test_previous_cursors_walk_back_across_the_undated_tasks(self):
+        pages = self.walk({'page_size': 2})
+        walked_back = [pages[-1]]
+        while walked_back[-1].has_previous:
+            response = self.client.get(self.url, {'page_size': 2, 'cursor': walked_back[-1].previous_cursor})
+            walked_back.append(response.context['page'])
+        self.assertEqual([[task.id for task in page] for page in reversed(walked_back)],
+                         [[task.id for task in page] for page in pages])
+
+    def test_seek_reads_each_deadline_segment_with_a_range(self):
+        paginator = KeysetPaginator(self.task_list.tasks.all(), 'deadline', 2)
+        dated = paginator.get_page_querysets((self.tasks[1].deadline, self.tasks[1].id, False))
+        self.assertEqual(len(dated), 2)
+        self.assertIn('"deadline" >= ', str(dated[0].query))
+        self.assertNotIn('IS NULL', str(dated[0].query))
+        self.assertIn('"deadline" IS NULL', str(dated[1].query))
+
+    def test_links_keep_filters(self):
+        response = self.client.get(self.url, {'page_size': 1, 'priority': 'Low', 'completed': 'False'})
+        next_cursor = response.context['page'].next_cursor
+        self.assertContains(response, f'?page_size=1&amp;priority=Low&amp;completed=False&amp;cursor={next_cursor}')
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.url, {'page_size': 3, 'cursor': 'not-a-cursor'})
+        self.assertEqual([task.id for task in response.context['page']], self.expected_ids()[:3])
+
+
+class TaskRowCacheTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.category = Category.objects.create(name='Work', created_by=self.user)
+        self.task = Task.objects.create(title='Cached task', priority='Low', category=self.category,
+                                        task_list=self.task_list)
+        self.url = reverse('view_task_list', args=[self.task_list.id])
+
+    def get(self, url=None, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url or self.url, params)
+        return response, len(queries)
+
+    def test_cached_rows_skip_the_task_queries(self):
+        first, first_count = self.get()
+        second, second_count = self.get()
+        self.assertLess(second_count, first_count)
+        self.assertEqual(second.context['task_rows'], first.context['task_rows'])
+        self.assertContains(second, 'Cached task')
+        self.assertEqual(len(first.context['page']), 1)
+
+    def test_filters_are_part_of_the_key(self):
+        self.get()
+        response, _ = self.get(params={'priority': 'High'})
+        self.assertNotContains(response, 'Cached task')
+
+    def test_task_changes_invalidate_rows(self):
+        self.get()
+        self.task.title = 'Renamed task'
+        self.task.save()
+        self.assertContains(self.get()[0], 'Renamed task')
+
+        self.assertContains(self.get()[0], 'Not assigned')
+        self.task.assigned_to.add(self.user)
+        self.assertNotContains(self.get()[0], 'Not assigned')
+
+        self.task.delete()
+        self.assertNotContains(self.get()[0], 'Renamed task')
+
+    def test_bulk_updates_invalidate_rows(self):
+        self.get(params={'completed': 'All'})
+        self.client.post(reverse('bulk_task_action', args=[self.task_list.id]),
+                         {'action': 'complete', 'tasks': [self.task.id]})
+        self.assertContains(self.get(params={'completed': 'All'})[0], 'Completed')
+
+    def test_category_rename_invalidates_rows(self):
+        self.get()
+        self.category.name = 'Errands'
+        self.category.save()
+        self.assertContains(self.get()[0], 'Errands')
+
+    def test_overview_rows_follow_task_changes(self):
+        url = reverse('task_lists')
+        self.assertContains(self.get(url)[0], '1 Tasks')
+        _, cached_count = self.get(url)
+        Task.objects.create(title='Another', priority='Low', task_list=self.task_list)
+        response, count = self.get(url)
+        self.assertContains(response, '2 Tasks')
+        self.assertGreater(count, cached_count)
+
+
+class ConditionalGetTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.task = Task.objects.create(title='Task', priority='Low', deadline=timezone.now() + timedelta(days=1),
+                                        task_list=self.task_list)
+        self.task.assigned_to.add(self.user)
+
+    def revalidate(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return self.client.get(url, params, headers={'If-None-Match': response['ETag']})
+
+    def test_unchanged_list_answers_not_modified(self):
+        url = reverse('view_task_list', args=[self.task_list.id])
+        self.assertEqual(self.revalidate(url).status_code, 304)
+        self.assertEqual(self.revalidate(reverse('task_lists')).status_code, 304)
+
+    def test_if_modified_since(self):
+        url = reverse('view_task_list', args=[self.task_list.id])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    def test_task_changes_move_the_etag(self):
+        url = reverse('view_task_list', args=[self.task_list.id])
+        etag = self.client.get(url)['ETag']
+        self.task.completed = True
+        self.task.save()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_sharing_moves_the_overview_etag(self):
+        url = reverse('task_lists')
+        etag = self.client.get(url)['ETag']
+        TaskList.objects.create(title='Shared', created_by=self.other_user).shared_with.add(self.user)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Shared')
+
+    def test_pending_messages_are_rendered(self):
+        url = reverse('view_task_list', args=[self.task_list.id])
+        etag = self.client.get(url)['ETag']
+        self.client.post(reverse('create_category'), {'name': 'Home'})
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_calendar_events(self):
+        params = {'start': timezone.now().isoformat(), 'end': (timezone.now() + timedelta(days=7)).isoformat()}
+        url = reverse('calendar_events')
+        self.assertEqual(self.revalidate(url, params).status_code, 304)
+
+        etag = self.client.get(url, params)['ETag']
+        self.task_list.title = 'Renamed'
+        self.task_list.save()
+        response = self.client.get(url, params, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Renamed', response.json()[0]['title'])
+
+
+class BulkTaskActionTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.tasks = [
+            Task.objects.create(title=f'Task {index}', priority='Low', task_list=self.task_list)
+            for index in range(5)
+        ]
+        self.url = reverse('bulk_task_action', args=[self.task_list.id])
+
+    def post(self, action, tasks=None, **data):
+        tasks = self.tasks if tasks is None else tasks
+        return self.client.post(self.url, {'action': action, 'tasks': [task.id for task in tasks], **data})
+
+    def test_complete_selected_tasks(self):
+        response = self.post('complete', self.tasks[:3])
+        self.assertRedirects(response, reverse('view_task_list', args=[self.task_list.id]),
+                             fetch_redirect_response=False)
+        self.assertEqual(Task.objects.filter(completed=True).count(), 3)
+
+    def test_query_count_does_not_grow_with_selection(self):
+        def count_queries(tasks):
+            with CaptureQueriesContext(connection) as queries:
+                self.post('set_priority', tasks, priority='High')
+            return len(queries)
+
+        count_queries(self.tasks[:1])
+        baseline = count_queries(self.tasks[:1])
+        for index in range(20):
+            self.tasks.append(Task.objects.create(title=f'Extra {index}', priority='Low', task_list=self.task_list))
+        self.assertEqual(count_queries(self.tasks), baseline)
+        self.assertEqual(Task.objects.filter(priority='High').count(), len(self.tasks))
+
+    def test_assign_and_delete(self):
+        self.task_list.shared_with.add(self.other_user)
+        self.post('assign', assigned_to=[self.user.id, self.other_user.id])
+        self.post('assign', assigned_to=[self.other_user.id])
+        self.assertEqual(Task.assigned_to.through.objects.count(), 10)
+
+        self.post('delete', self.tasks[:2])
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(Task.assigned_to.through.objects.count(), 6)
+
+    def test_move_requires_accessible_target(self):
+        foreign_list = TaskList.objects.create(title='Foreign', created_by=self.other_user)
+        self.post('move', target_task_list=foreign_list.id)
+        self.assertFalse(foreign_list.tasks.exists())
+
+        own_list = TaskList.objects.create(title='Mine', created_by=self.user)
+        self.post('move', target_task_list=own_list.id)
+        self.assertEqual(own_list.tasks.count(), 5)
+
+    def test_tasks_from_other_lists_are_rejected(self):
+        foreign_list = TaskList.objects.create(title='Foreign', created_by=self.other_user)
+        foreign_task = Task.objects.create(title='Foreign', priority='Low', task_list=foreign_list)
+        self.post('complete', [foreign_task])
+        foreign_task.refresh_from_db()
+        self.assertFalse(foreign_task.completed)
+
+
+@override_settings(ROOT_URLCONF='task_manager.test.async_urls')
+class AsyncReadViewsTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        self.task = Task.objects.create(title='Async task', priority='High',
+                                        deadline=timezone.now() + timedelta(days=1), task_list=self.task_list)
+        self.task.assigned_to.add(self.user)
+
+    def sync_get(self, url, params=None):
+        with self.settings(ROOT_URLCONF='gestionnaire_taches_project.urls'):
+            response = self.client.get(url, params)
+        cache.clear()
+        return response
+
+    async def test_overview_matches_the_sync_view(self):
+        url = reverse('task_lists')
+        expected = await sync_to_async(self.sync_get)(url)
+        response = await self.async_client.get(url)
+        self.assertIs(response.resolver_match.func.view_class, AsyncTaskListView)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['task_list_rows'], expected.context['task_list_rows'])
+
+    async def test_detail_matches_the_sync_view(self):
+        url = reverse('view_task_list', args=[self.task_list.id])
+        expected = await sync_to_async(self.sync_get)(url)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['task_rows'], expected.context['task_rows'])
+        self.assertContains(response, 'Async task')
+        self.assertEqual(list(response.context['users']), list(expected.context['users']))
+
+    async def test_calendar_matches_the_sync_view(self):
+        params = {'start': timezone.now().isoformat(), 'end': (timezone.now() + timedelta(days=7)).isoformat()}
+        url = reverse('calendar_events')
+        expected = await sync_to_async(self.sync_get)(url, params)
+        response = await self.async_client.get(url, params)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual((await self.async_client.get(url, {'start': 'nope'})).status_code, 400)
+
+    async def test_revalidation(self):
+        url = reverse('view_task_list', args=[self.task_list.id])
+        etag = (await self.async_client.get(url))['ETag']
+        response = await self.async_client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_inaccessible_list(self):
+        task_list = await TaskList.objects.acreate(title='Private', created_by=self.other_user)
+        response = await self.async_client.get(reverse('view_task_list', args=[task_list.id]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_anonymous_user_is_redirected(self):
+        response = await AsyncClient().get(reverse('task_lists'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('login'), response.url)
+
+    async def test_queries_are_recorded(self):
+        response = await self.async_client.get(reverse('view_task_list', args=[self.task_list.id]))
+        queries = int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+        self.assertGreater(queries, 3)
+
+
+class TaskListEventsTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        self.url = reverse('task_list_events', args=[self.task_list.id])
+
+    def commit(self, change):
+        # Commit hooks are registered on the connection of the thread running the ORM, not the event loop's.
+        with self.captureOnCommitCallbacks(execute=True):
+            return change()
+
+    async def next_chunk(self, stream):
+        return (await asyncio.wait_for(anext(stream), timeout=5)).decode()
+
+    async def test_stream_pushes_task_changes(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await self.next_chunk(stream)).startswith('retry:'))
+
+        task = await sync_to_async(self.commit)(
+            lambda: Task.objects.create(title='Live', priority='Low', task_list=self.task_list)
+        )
+        self.assertEqual(await self.next_chunk(stream), (
+            f'event: created\ndata: {{"type": "created", "id": {task.id}, "title": "Live", "priority": "Low", '
+            f'"deadline": null, "completed": false}}\n\n'
+        ))
+
+        task.completed = True
+        await sync_to_async(self.commit)(lambda: task.save(update_fields=['completed', 'updated_at']))
+        self.assertIn(f'data: {{"type": "completed", "id": {task.id}, "completed": true}}',
+                      await self.next_chunk(stream))
+
+        await sync_to_async(self.commit)(task.delete)
+        self.assertIn('event: deleted', await self.next_chunk(stream))
+        await stream.aclose()
+
+    async def test_idle_stream_sends_keepalives(self):
+        with mock.patch.object(TaskListEventsView, 'heartbeat', 0.01):
+            response = await self.async_client.get(self.url)
+            stream = aiter(response.streaming_content)
+            self.assertTrue((await self.next_chunk(stream)).startswith('retry:'))
+            self.assertEqual(await self.next_chunk(stream), ': keepalive\n\n')
+            await stream.aclose()
+
+    async def test_inaccessible_list(self):
+        task_list = await TaskList.objects.acreate(title='Private', created_by=self.other_user)
+        response = await self.async_client.get(reverse('task_list_events', args=[task_list.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse('home'))
+
+    def test_not_served_over_wsgi(self):
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+        response = self.client.get(reverse('view_task_list', args=[self.task_list.id]))
+        self.assertNotContains(response, 'EventSource')
+
+
+class MarkTaskCompletedTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.task = Task.objects.create(title='Toggle me', priority='Low', task_list=self.task_list)
+        self.url = reverse('mark_task_completed', args=[self.task_list.id, self.task.id])
+
+    def test_form_post_redirects(self):
+        response = self.client.post(self.url)
+        self.assertRedirects(response, reverse('view_task_list', args=[self.task_list.id]),
+                             fetch_redirect_response=False)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.completed)
+
+    def test_json_toggle(self):
+        page = reverse('view_task_list', args=[self.task_list.id])
+        self.client.get(page)
+        updated_at = self.task.updated_at
+
+        response = self.client.post(self.url, headers={'Accept': 'application/json'})
+        self.assertEqual(response.json(), {'id': self.task.id, 'completed': True})
+        self.task.refresh_from_db()
+        self.task_list.refresh_from_db()
+        self.assertTrue(self.task.completed)
+        self.assertGreater(self.task.updated_at, updated_at)
+        self.assertEqual(self.task_list.completed_tasks, 1)
+        # No flash message is left for the next page, and the cached rows were dropped.
+        self.assertContains(self.client.get(page, {'completed': 'All'}), 'Completed')
+        self.assertFalse(list(get_messages(self.client.get(page).wsgi_request)))
+
+        response = self.client.post(self.url, headers={'Accept': 'application/json'})
+        self.assertEqual(response.json(), {'id': self.task.id, 'completed': False})
+        self.task_list.refresh_from_db()
+        self.assertEqual(self.task_list.completed_tasks, 0)
+
+    def test_json_toggle_of_another_lists_task(self):
+        other_list = TaskList.objects.create(title='Mine too', created_by=self.user)
+        url = reverse('mark_task_completed', args=[other_list.id, self.task.id])
+        response = self.client.post(url, headers={'Accept': 'application/json'})
+        self.assertEqual(response.status_code, 404)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.completed)
+
+
+class ArchivedTasksTestCase(CommonSetUp):
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser', password='12345')
+        self.task = Task.objects.create(title='Archived task', priority='Low', completed=True,
+                                        task_list=self.task_list)
+        Task.objects.create(title='Current task', priority='Low', task_list=self.task_list)
+        Task.objects.filter(pk=self.task.pk).update(updated_at=timezone.now() - timedelta(days=100))
+        archive_completed_tasks(30)
+        self.url = reverse('view_task_list', args=[self.task_list.id])
+
+    def test_archive_is_read_on_request_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'completed': 'All'})
+        self.assertNotContains(response, 'Archived task')
+        self.assertContains(response, 'Current task')
+        self.assertFalse([query for query in queries if 'task_manager_archivedtask' in query['sql']])
+
+        response = self.client.get(self.url, {'archived': 'True'})
+        self.assertContains(response, 'Archived task')
+        self.assertNotContains(response, 'Current task')
+        self.assertContains(response, reverse('restore_archived_task', args=[self.task_list.id, self.task.id]))
+
+    def test_restore(self):
+        self.client.get(self.url, {'archived': 'True'})
+        response = self.client.post(reverse('restore_archived_task', args=[self.task_list.id, self.task.id]))
+        self.assertRedirects(response, f'{self.url}?archived=True', fetch_redirect_response=False)
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertTrue(Task.objects.get(pk=self.task.pk).completed)
+        self.assertContains(self.client.get(self.url, {'completed': 'True'}), 'Archived task')
+        self.assertNotContains(self.client.get(self.url, {'archived': 'True'}), 'Archived task')
+
+    def test_restore_from_another_list(self):
+        other_list = TaskList.objects.create(title='Mine too', created_by=self.user)
+        self.client.post(reverse('restore_archived_task', args=[other_list.id, self.task.id]))
+        self.assertTrue(ArchivedTask.objects.filter(pk=self.task.pk).exists())
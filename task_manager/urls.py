@@ -1,18 +1,36 @@
+from django.conf import settings
 from django.contrib.sitemaps.views import sitemap
 from django.http import HttpResponse
-from django.urls import path
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
 
-from task_manager import views
+from task_manager import api, async_views, views
+from task_manager.middleware import query_budget
 from task_manager.sitemaps import StaticViewSitemap
 
+if settings.ASYNC_READ_VIEWS:
+    TaskListView = async_views.AsyncTaskListView
+    TaskListDetailView = async_views.AsyncTaskListDetailView
+    CalendarEventsView = async_views.AsyncCalendarEventsView
+else:
+    TaskListView = views.TaskListView
+    TaskListDetailView = views.TaskListDetailView
+    CalendarEventsView = views.CalendarEventsView
+
 urlpatterns = [
-    path('task_lists/', views.TaskListView.as_view(), name='task_lists'),
+    path('task_lists/', TaskListView.as_view(), name='task_lists'),
     path('create_task_list/', views.CreateTaskListView.as_view(), name='create_task_list'),
-    path('task_list/<int:pk>/', views.TaskListDetailView.as_view(), name='view_task_list'),
+    path('task_list/<int:pk>/', TaskListDetailView.as_view(), name='view_task_list'),
     path('task_list/<int:pk>/update/', views.UpdateTaskListView.as_view(), name='update_task_list'),
     path('task_list/<int:pk>/delete/', views.DeleteTaskListView.as_view(), name='delete_task_list'),
     path('task_list/<int:pk>/share/', views.ShareTaskListView.as_view(), name='share_task_list'),
+    path('task_list/<int:pk>/export/', views.ExportTaskListView.as_view(), name='export_task_list'),
+    path('task_list/<int:pk>/import/', views.ImportTasksView.as_view(), name='import_tasks'),
+    path('task_list/<int:pk>/events/', async_views.TaskListEventsView.as_view(), name='task_list_events'),
+    path('task_lists/export/', views.ExportTasksView.as_view(), name='export_tasks'),
     path('', views.HomeView.as_view(), name='home'),
+    path('search/', views.SearchView.as_view(), name='search_tasks'),
+    path('calendar/events/', CalendarEventsView.as_view(), name='calendar_events'),
     path('accounts/register/', views.RegisterView.as_view(), name='register'),
     path('accounts/login/', views.LoginView.as_view(), name='login'),
     path('accounts/logout/', views.LogoutView.as_view(), name='logout'),
@@ -21,22 +39,36 @@ urlpatterns = [
     path('task_list/<int:task_list_id>/delete_task/<int:pk>/', views.DeleteTaskView.as_view(), name='delete_task'),
     path('task_list/<int:task_list_id>/completed/<int:pk>/', views.MarkTaskCompletedView.as_view(),
          name='mark_task_completed'),
+    path('task_list/<int:task_list_id>/restore_task/<int:pk>/', views.RestoreArchivedTaskView.as_view(),
+         name='restore_archived_task'),
+    path('task_list/<int:task_list_id>/bulk_action/', views.BulkTaskActionView.as_view(), name='bulk_task_action'),
     path('categories/create/', views.CreateCategoryView.as_view(), name='create_category'),
     path('categories/<int:pk>/update/', views.UpdateCategoryView.as_view(), name='update_category'),
     path('categories/<int:pk>/delete/', views.DeleteCategoryView.as_view(), name='delete_category'),
     path('categories/', views.CategoryListView.as_view(), name='category_list'),
 ]
 
+router = DefaultRouter()
+router.APIRootView = api.ApiRootView
+router.register('task_lists', api.TaskListViewSet, basename='api-task-list')
+router.register('tasks', api.TaskViewSet, basename='api-task')
+router.register('categories', api.CategoryViewSet, basename='api-category')
+
+urlpatterns += [
+    path('api/', include(router.urls)),
+]
+
 sitemaps = {
     'static': StaticViewSitemap,
 }
 
 urlpatterns += [
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
+    path('sitemap.xml', query_budget(1)(sitemap), {'sitemaps': sitemaps},
          name='django.contrib.sitemaps.views.sitemap')
 ]
 
 
+@query_budget(1)
 def robots_txt(request):
     lines = [
         "User-Agent: *",
@@ -49,5 +81,5 @@ def robots_txt(request):
 
 
 urlpatterns += [
-    path("robots.txt", robots_txt),
+    path("robots.txt", robots_txt, name="robots_txt"),
 ]
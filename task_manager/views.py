@@ -1,53 +1,133 @@
-import json
+import csv
+import hashlib
+import io
+from datetime import datetime, time
+from functools import partial
 
 from django.contrib import messages
+from django.contrib.messages import get_messages
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.auth.models import User
-from django.db.models import Q
-from django.http import HttpResponseRedirect
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max, Q
+from django.http import Http404, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, \
+    StreamingHttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
-from django.utils.http import url_has_allowed_host_and_scheme
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, url_has_allowed_host_and_scheme
 from django.views import View
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView, FormView
-
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView, FormView, \
+    TemplateView
+
+from task_manager.archive import restore_archived_tasks
+from task_manager.bulk import apply_bulk_action, toggle_completed
+from task_manager.caching import aget_accessible_task_list_ids, fragment_cache_key, get_accessible_task_list_ids, \
+    get_or_render_fragment, get_task_list_members, get_task_list_version, get_task_list_versions, \
+    get_visible_categories
+from task_manager.changes import task_count_subquery
+from task_manager.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS
 from task_manager.forms import TaskListForm, TaskForm, UserRegistrationForm, UserLoginForm, ShareTaskListForm, \
-    CategoryForm
-from task_manager.models import TaskList, Task, Category
+    CategoryForm, BulkTaskActionForm, TaskImportUploadForm
+from task_manager.importer import guess_format, import_tasks, read_rows
+from task_manager.models import ArchivedTask, TaskList, Task, Category
+from task_manager.pagination import KeysetPage, KeysetPaginator
+from task_manager.purge import soft_delete_task_list
+from task_manager.search import add_highlights, search_tasks
+from task_manager.sharing import share_task_list
 
 
 class TaskListAccessMixin(LoginRequiredMixin):
 
     def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
         self.task_list = self.get_task_list()
         return super().dispatch(request, *args, **kwargs)
 
     def get_task_list(self):
-        task_list_id = self.kwargs.get('task_list_id') or self.kwargs.get('pk')
-        return get_object_or_404(
-            TaskList,
-            Q(pk=task_list_id),
-            Q(created_by=self.request.user) | Q(shared_with=self.request.user)
-        )
+        # Resolved once per request; TaskFormMixin asks for it again while building the form.
+        if getattr(self, '_task_list', None) is None:
+            task_list_id = self.kwargs.get('task_list_id') or self.kwargs.get('pk')
+            if task_list_id not in get_accessible_task_list_ids(self.request.user):
+                raise Http404('No TaskList matches the given query.')
+            self._task_list = get_object_or_404(TaskList, pk=task_list_id)
+        return self._task_list
+
+
+class TaskListObjectMixin(TaskListAccessMixin):
+    """For views whose object is the task list itself, which the access check already loaded."""
+
+    def get_object(self, queryset=None):
+        return self.task_list
 
 
 class TaskFormMixin(TaskListAccessMixin):
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         task_list = self.get_task_list()
-        user_category_ids = Category.objects.filter(created_by=self.request.user).values_list('id', flat=True)
-        task_list_category_ids = Category.objects.filter(tasks__task_list=task_list).values_list('id', flat=True)
-        all_category_ids = set(user_category_ids) | set(task_list_category_ids)
-        all_categories = Category.objects.filter(id__in=all_category_ids)
         kwargs.update({
-            'user_categories': all_categories,
+            'user_categories': get_visible_categories(self.request.user, [task_list.pk]),
             'task_list': task_list
         })
         return kwargs
 
 
-class CreateTaskListView(TaskList, CreateView):
+class ConditionalGetMixin:
+    """Answer If-None-Match / If-Modified-Since with a 304 before the response is built."""
+
+    def conditional_response(self, etag_parts, last_modified, render):
+        response, validators = self.check_not_modified(etag_parts, last_modified)
+        return self.add_validators(response or render(), validators)
+
+    async def aconditional_response(self, etag_parts, last_modified, render):
+        response, validators = self.check_not_modified(etag_parts, last_modified)
+        return self.add_validators(response or await render(), validators)
+
+    def check_not_modified(self, etag_parts, last_modified):
+        """Return the 304 response, or None, and the validators to add to the response."""
+        # Pending flash messages are only shown by a full render.
+        if len(get_messages(self.request)):
+            return None, None
+        etag = quote_etag(hashlib.md5(repr(etag_parts).encode(), usedforsecurity=False).hexdigest())
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(self.request, etag=etag, last_modified=last_modified), (etag, last_modified)
+
+    @staticmethod
+    def add_validators(response, validators):
+        if validators is None:
+            return response
+        etag, last_modified = validators
+        response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_task_lists_state(self):
+        """Return the ids of the lists the user can open and the latest updated_at among them."""
+        task_list_ids = get_accessible_task_list_ids(self.request.user)
+        latest = TaskList.objects.filter(id__in=task_list_ids).aggregate(latest=Max('updated_at'))['latest']
+        return sorted(task_list_ids), latest
+
+    async def aget_task_lists_state(self):
+        task_list_ids = await aget_accessible_task_list_ids(self.request.user)
+        latest = (await TaskList.objects.filter(id__in=task_list_ids).aaggregate(latest=Max('updated_at')))['latest']
+        return sorted(task_list_ids), latest
+
+    def get_page_etag_parts(self, *parts):
+        # Pages embed the user's CSRF token, so a new token has to miss as well.
+        request = self.request
+        get_token(request)
+        return request.user.pk, request.META['CSRF_COOKIE'], request.get_full_path(), *parts
+
+
+class CreateTaskListView(LoginRequiredMixin, CreateView):
+    query_budget = 4
     model = TaskList
     form_class = TaskListForm
     template_name = 'task_manager/create_task_list.html'
@@ -59,61 +139,134 @@ class CreateTaskListView(TaskList, CreateView):
         return super().form_valid(form)
 
 
-class TaskListView(LoginRequiredMixin, ListView):
+class TaskListView(ConditionalGetMixin, LoginRequiredMixin, ListView):
+    query_budget = 6
+    use_replica = True
     model = TaskList
     context_object_name = 'task_lists'
     template_name = 'task_manager/task_lists.html'
 
+    def get(self, request, *args, **kwargs):
+        task_list_ids, latest = self.get_task_lists_state()
+        return self.conditional_response(
+            *self.get_validators(task_list_ids, latest), partial(self.render_page, task_list_ids),
+        )
+
+    def get_validators(self, task_list_ids, latest):
+        # Overdue counts move with the clock, so the page is not reused across minutes.
+        minute = timezone.now().replace(second=0, microsecond=0)
+        return self.get_page_etag_parts(task_list_ids, latest, minute), max(filter(None, [latest, minute]))
+
+    def render_page(self, task_list_ids):
+        self.object_list = self.get_queryset()
+        rows = get_or_render_fragment(self.get_rows_cache_key(get_task_list_versions(task_list_ids)), self.render_rows)
+        return self.render_to_response(self.get_context_data(task_list_rows=rows))
+
     def get_queryset(self):
+        user = self.request.user
+        now = timezone.now()
+        # Shared lists go through a subquery so the tasks join is not multiplied by shared_with rows.
         return TaskList.objects.filter(
-            Q(created_by=self.request.user) | Q(shared_with=self.request.user)
-        ).distinct()
+            Q(created_by=user) | Q(id__in=user.shared_task_lists.values('id')), deleted_at__isnull=True,
+        ).select_related('created_by').annotate(
+            # The other counters are stored on the list; overdue depends on the clock and is counted on the
+            # partial index of open deadlines.
+            overdue_tasks=task_count_subquery(completed=False, deadline__lt=now),
+        ).order_by('-created_at')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = self.get_user_related_categories()
+        # A callable, so the categories are only resolved if the template shows them.
+        context['categories'] = self.get_user_related_categories
         return context
 
+    def get_rows_cache_key(self, versions):
+        # Overdue counts move with the clock, so the rows are not reused across minutes.
+        minute = int(timezone.now().timestamp()) // 60
+        return fragment_cache_key('task_list_rows', self.request.user.pk, minute, sorted(versions.items()))
+
+    def render_rows(self, task_lists=None):
+        return render_to_string(
+            'task_manager/includes/task_list_rows.html',
+            {'task_lists': self.object_list if task_lists is None else task_lists},
+            self.request,
+        )
+
     def get_user_related_categories(self):
         user = self.request.user
-        user_categories = Category.objects.filter(created_by=user)
-        shared_categories = Category.objects.filter(tasks__task_list__shared_with=user).distinct()
-        return user_categories.union(shared_categories)
+        return get_visible_categories(user, get_accessible_task_list_ids(user))
 
 
-class UpdateTaskListView(TaskListAccessMixin, UpdateView):
+class UpdateTaskListView(TaskListObjectMixin, UpdateView):
+    query_budget = 5
     model = TaskList
     form_class = TaskListForm
     template_name = 'task_manager/update_task_list.html'
     success_url = reverse_lazy('task_lists')
 
 
-class DeleteTaskListView(TaskListAccessMixin, DeleteView):
+class DeleteTaskListView(TaskListObjectMixin, DeleteView):
+    query_budget = 6
     model = TaskList
     template_name = 'task_manager/delete_task_list.html'
     success_url = reverse_lazy('task_lists')
 
+    def form_valid(self, form):
+        # Hidden straight away; the run_jobs worker deletes the tasks in batches.
+        soft_delete_task_list(self.object)
+        return HttpResponseRedirect(self.get_success_url())
 
-class TaskListDetailView(TaskListAccessMixin, DetailView):
+
+class TaskListDetailView(ConditionalGetMixin, TaskListObjectMixin, DetailView):
+    query_budget = 16
+    use_replica = True
     model = TaskList
     context_object_name = 'task_list'
     template_name = 'task_manager/view_task_list.html'
+    paginate_by = 50
+    max_paginate_by = 200
+    row_cache_params = (
+        'user_id', 'date', 'completed', 'priority', 'category', 'sort', 'cursor', 'page_size', 'archived',
+    )
+    page = None
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        tasks = self.object.tasks.all()
-
-        user_categories_ids = set(Category.objects.filter(created_by=self.request.user).values_list('id', flat=True))
+    def get(self, request, *args, **kwargs):
+        # Tasks, sharing and the user's categories all move updated_at of the lists they show up in.
+        task_list_ids, latest = self.get_task_lists_state()
+        return self.conditional_response(self.get_page_etag_parts(task_list_ids, latest), latest, self.render_page)
+
+    def render_page(self):
+        self.object = self.get_object()
+        return self.render_to_response(self.get_context_data(object=self.object, **self.get_page_data()))
+
+    def get_page_data(self):
+        version = get_task_list_version(self.object.pk)
+        return {
+            'categories': get_visible_categories(self.request.user, [self.object.pk]),
+            'rows': get_or_render_fragment(self.get_rows_cache_key(version), self.render_rows),
+            'users': get_task_list_members(self.object),
+            'accessible_task_list_ids': get_accessible_task_list_ids(self.request.user),
+        }
+
+    def get_paginate_by(self):
+        try:
+            page_size = int(self.request.GET.get('page_size', self.paginate_by))
+        except ValueError:
+            return self.paginate_by
+        return max(1, min(page_size, self.max_paginate_by))
 
-        task_categories_ids = set(Category.objects.filter(tasks__in=tasks).values_list('id', flat=True))
+    def show_archived(self):
+        return self.request.GET.get('archived') == 'True'
 
-        combined_category_ids = user_categories_ids.union(task_categories_ids)
-        combined_categories = Category.objects.filter(id__in=combined_category_ids)
+    def get_tasks(self):
+        tasks = self.object.tasks.all()
+        completed = self.request.GET.get('completed', 'False')
+        if self.show_archived():
+            # The archive is only read when asked for; the tasks in it are all completed.
+            tasks, completed = self.object.archived_tasks.all(), None
 
         user_id = self.request.GET.get('user_id')
         date = self.request.GET.get('date')
-        sort_order = self.request.GET.get('sort', 'deadline')
-        completed = self.request.GET.get('completed', 'False')
         priority = self.request.GET.get('priority')
         category_id = self.request.GET.get('category')
 
@@ -125,26 +278,56 @@ class TaskListDetailView(TaskListAccessMixin, DetailView):
             tasks = tasks.filter(completed=True)
         elif completed == 'False':
             tasks = tasks.filter(completed=False)
-        elif completed == 'All':
-            tasks = self.object.tasks.all()
         if category_id:
             tasks = tasks.filter(category__id=category_id)
 
         if priority:
             tasks = tasks.filter(priority=priority)
 
-        if sort_order:
-            tasks = tasks.order_by(sort_order)
+        return tasks.select_related('task_list', 'category').prefetch_related('assigned_to')
 
-        tasks = tasks.select_related('task_list', 'category').prefetch_related('assigned_to')
+    def get_paginator(self, tasks):
+        sort_order = self.request.GET.get('sort') or 'deadline'
+        return KeysetPaginator(tasks, 'deadline', self.get_paginate_by(), descending=sort_order == '-deadline')
 
-        context['tasks'] = tasks
-        context['users'] = User.objects.all()
-        context['categories'] = combined_categories
+    def get_context_data(self, *, categories, rows, users, accessible_task_list_ids, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.page is None:
+            # Served from the cache: only the cursors are known, the tasks were never loaded.
+            self.page = KeysetPage(
+                next_cursor=rows['next_cursor'], previous_cursor=rows['previous_cursor'],
+                page_size=self.get_paginate_by(),
+            )
+        context['page'] = self.page
+        context['task_rows'] = rows['html']
+        context['show_archived'] = self.show_archived()
+        # The live updates stream is only served over ASGI.
+        context['live_updates'] = isinstance(self.request, ASGIRequest) and not self.show_archived()
+        context['users'] = users
+        context['categories'] = categories
+        context['bulk_form'] = BulkTaskActionForm(
+            task_list=self.object,
+            user_categories=categories,
+            accessible_task_list_ids=accessible_task_list_ids,
+        )
         return context
 
+    def get_rows_cache_key(self, version):
+        params = [(name, self.request.GET.get(name)) for name in self.row_cache_params]
+        return fragment_cache_key('task_rows', self.object.pk, version, params)
+
+    def render_rows(self):
+        return self.rows_fragment(self.get_paginator(self.get_tasks()).get_page(self.request.GET.get('cursor')))
+
+    def rows_fragment(self, page):
+        self.page = page
+        template_name = 'archived_task_rows.html' if self.show_archived() else 'task_rows.html'
+        html = render_to_string(f'task_manager/includes/{template_name}', {'tasks': page, 'task_list': self.object})
+        return {'html': html, 'next_cursor': page.next_cursor, 'previous_cursor': page.previous_cursor}
+
 
 class CreateTaskView(TaskFormMixin, CreateView):
+    query_budget = 11
     model = Task
     form_class = TaskForm
     template_name = 'task_manager/create_task.html'
@@ -163,7 +346,8 @@ class CreateTaskView(TaskFormMixin, CreateView):
         return context
 
 
-class UpdateTaskView(TaskListAccessMixin, UpdateView):
+class UpdateTaskView(TaskFormMixin, UpdateView):
+    query_budget = 15
     model = Task
     form_class = TaskForm
     template_name = 'task_manager/update_task.html'
@@ -181,6 +365,7 @@ class UpdateTaskView(TaskListAccessMixin, UpdateView):
 
 
 class DeleteTaskView(TaskListAccessMixin, DeleteView):
+    query_budget = 6
     model = Task
     template_name = 'task_manager/delete_task.html'
 
@@ -197,15 +382,124 @@ class DeleteTaskView(TaskListAccessMixin, DeleteView):
 
 
 class MarkTaskCompletedView(TaskListAccessMixin, View):
+    query_budget = 7
+
     def post(self, request, task_list_id, pk, *args, **kwargs):
-        task = get_object_or_404(Task, pk=pk, task_list=self.task_list)
-        task.completed = not task.completed
-        task.save()
+        completed = toggle_completed(self.task_list, pk)
+        if self.wants_json():
+            # Sent by the task list page, which updates the row in place.
+            if completed is None:
+                return JsonResponse({'error': 'No Task matches the given query.'}, status=404)
+            return JsonResponse({'id': pk, 'completed': completed})
+        if completed is None:
+            raise Http404('No Task matches the given query.')
         messages.success(request, 'Task status updated successfully.')
         return redirect('view_task_list', pk=task_list_id)
 
+    def wants_json(self):
+        return self.request.accepts('application/json') and not self.request.accepts('text/html')
+
+
+class RestoreArchivedTaskView(TaskListAccessMixin, View):
+    query_budget = 12
+
+    def post(self, request, task_list_id, pk, *args, **kwargs):
+        if not restore_archived_tasks(ArchivedTask.objects.filter(pk=pk, task_list=self.task_list)):
+            raise Http404('No ArchivedTask matches the given query.')
+        messages.success(request, 'Task restored successfully.')
+        return redirect(f"{reverse('view_task_list', kwargs={'pk': task_list_id})}?archived=True")
+
+
+class BulkTaskActionView(TaskFormMixin, FormView):
+    query_budget = 14
+    form_class = BulkTaskActionForm
+    http_method_names = ['post']
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['accessible_task_list_ids'] = get_accessible_task_list_ids(self.request.user)
+        return kwargs
+
+    def form_valid(self, form):
+        data = form.cleaned_data
+        count = apply_bulk_action(
+            data['tasks'], data['action'],
+            priority=data['priority'],
+            category=data['category'],
+            assigned_to=data['assigned_to'],
+            target_task_list=data['target_task_list'],
+        )
+        messages.success(self.request, f'{count} task(s) updated successfully.')
+        return super().form_valid(form)
+
+    def form_invalid(self, form):
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(self.request, error)
+        return redirect(self.get_success_url())
+
+    def get_success_url(self):
+        return reverse_lazy('view_task_list', kwargs={'pk': self.task_list.pk})
+
+
+class TaskExportMixin:
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    def render_export(self, tasks, filename):
+        export_format = self.request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"Unsupported export format '{export_format}'.")
+        stream, content_type, extension = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(stream(tasks, self.export_chunk_size), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+        return response
+
+
+class ExportTaskListView(TaskExportMixin, TaskListAccessMixin, View):
+    query_budget = 5
+
+    def get(self, request, *args, **kwargs):
+        return self.render_export(self.task_list.tasks.all(), f'task_list_{self.task_list.pk}')
+
+
+class ExportTasksView(TaskExportMixin, LoginRequiredMixin, View):
+    query_budget = 4
+
+    def get(self, request, *args, **kwargs):
+        tasks = Task.objects.filter(task_list_id__in=get_accessible_task_list_ids(request.user))
+        return self.render_export(tasks, 'tasks')
+
+
+class ImportTasksView(TaskListAccessMixin, FormView):
+    query_budget = {'GET': 5, 'POST': 11}
+    form_class = TaskImportUploadForm
+    template_name = 'task_manager/import_tasks.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['task_list'] = self.task_list
+        return context
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = import_tasks(self.task_list, self.request.user,
+                                  read_rows(stream, guess_format(upload.name)),
+                                  dry_run=form.cleaned_data['dry_run'])
+        except (ValueError, csv.Error) as error:
+            form.add_error('file', f'Could not read the file: {error}')
+            return self.form_invalid(form)
+
+        if report.dry_run:
+            messages.info(self.request, f'Dry run: {report.created} task(s) would be imported.')
+        else:
+            messages.success(self.request, f'{report.created} task(s) imported successfully.')
+        return self.render_to_response(self.get_context_data(form=form, report=report))
+
 
 class ShareTaskListView(TaskListAccessMixin, FormView):
+    query_budget = 8
     form_class = ShareTaskListForm
     template_name = 'task_manager/share_task_list.html'
 
@@ -214,14 +508,19 @@ class ShareTaskListView(TaskListAccessMixin, FormView):
         context['task_list_id'] = self.kwargs.get('pk')
         return context
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
     def form_valid(self, form):
-        email = form.cleaned_data['email']
-        try:
-            user_to_share_with = User.objects.get(email=email)
-            self.task_list.shared_with.add(user_to_share_with)
-            messages.success(self.request, 'List shared successfully.')
-        except User.DoesNotExist:
-            messages.error(self.request, 'User does not exist.')
+        report = share_task_list(self.task_list, form.cleaned_data['emails'], form.cleaned_data['group'])
+        if report.shared:
+            messages.success(self.request, f'List shared with {report.shared} user(s).')
+        if report.already_shared:
+            messages.info(self.request, f'{report.already_shared} user(s) already had access.')
+        if report.not_found:
+            messages.error(self.request, f"No user found for: {', '.join(report.not_found)}.")
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -229,6 +528,7 @@ class ShareTaskListView(TaskListAccessMixin, FormView):
 
 
 class CreateCategoryView(LoginRequiredMixin, CreateView):
+    query_budget = 5
     model = Category
     form_class = CategoryForm
     template_name = 'task_manager/create_category.html'
@@ -241,6 +541,7 @@ class CreateCategoryView(LoginRequiredMixin, CreateView):
 
 
 class UpdateCategoryView(LoginRequiredMixin, UpdateView):
+    query_budget = 7
     model = Category
     form_class = CategoryForm
     template_name = 'task_manager/update_category.html'
@@ -251,6 +552,7 @@ class UpdateCategoryView(LoginRequiredMixin, UpdateView):
 
 
 class DeleteCategoryView(LoginRequiredMixin, DeleteView):
+    query_budget = {'GET': 3, 'POST': 9}
     model = Category
     template_name = 'task_manager/delete_category.html'
     success_url = reverse_lazy('category_list')
@@ -260,6 +562,8 @@ class DeleteCategoryView(LoginRequiredMixin, DeleteView):
 
 
 class CategoryListView(LoginRequiredMixin, ListView):
+    query_budget = 4
+    use_replica = True
     model = Category
     template_name = 'task_manager/category_list.html'
     context_object_name = 'categories'
@@ -268,56 +572,117 @@ class CategoryListView(LoginRequiredMixin, ListView):
         return Category.objects.filter(created_by=self.request.user)
 
 
-class HomeView(View):
+class SearchView(LoginRequiredMixin, ListView):
+    query_budget = 6
+    template_name = 'task_manager/search_results.html'
+    paginate_by = 25
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        query = self.get_search_query()
+        if not query:
+            return Task.objects.none()
+        return search_tasks(self.request.user, query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        context['tasks'] = add_highlights(list(context['object_list']), context['query'])
+        return context
+
+
+class HomeView(TemplateView):
+    query_budget = 3
+    use_replica = True
     template_name = 'home.html'
 
+
+class CalendarEventsView(ConditionalGetMixin, LoginRequiredMixin, View):
+    query_budget = 7
+    use_replica = True
+    priority_colors = {
+        'High': '#ff0000',
+        'Medium': '#ffa500',
+        'Low': '#008000',
+    }
+    # Events also print the list title and the category name, which move the list's updated_at.
+    state_aggregates = {
+        'count': Count('id'), 'latest_task': Max('updated_at'), 'latest_task_list': Max('task_list__updated_at'),
+    }
+
     def get(self, request, *args, **kwargs):
-        context = self.get_context_data(request)
-        return render(request, self.template_name, context)
+        start, end = self.get_bounds()
+        if start is None:
+            return self.invalid_bounds()
+        tasks = self.get_queryset(start, end)
+        state = tasks.aggregate(**self.state_aggregates)
+        return self.conditional_response(
+            *self.get_validators(start, end, state), lambda: self.render_events(tasks),
+        )
+
+    def render_events(self, tasks):
+        return JsonResponse([self.serialize_task(task) for task in tasks], safe=False)
+
+    def get_validators(self, start, end, state):
+        last_modified = max(filter(None, [state['latest_task'], state['latest_task_list']]), default=None)
+        return (self.request.user.pk, start, end, *state.values()), last_modified
+
+    def get_bounds(self):
+        start = self.parse_bound(self.request.GET.get('start'))
+        end = self.parse_bound(self.request.GET.get('end'))
+        if start is None or end is None or start >= end:
+            return None, None
+        return start, end
 
     @staticmethod
-    def get_context_data(request):
-        context = {}
-        if request.user.is_authenticated:
-            user_tasks = Task.objects.filter(
-                Q(assigned_to=request.user, completed=False, deadline__isnull=False) |
-                Q(task_list__shared_with=request.user, assigned_to=request.user, completed=False,
-                  deadline__isnull=False)
-            ).select_related('task_list').prefetch_related('assigned_to').order_by('deadline')
-
-            tasks_data = []
-            for task in user_tasks:
-                priority_colors = {
-                    'High': '#ff0000',
-                    'Medium': '#ffa500',
-                    'Low': '#008000',
-                }
-                color = priority_colors.get(task.priority, '#007bff')
-
-                assigned_to_name = ', '.join(user.username for user in task.assigned_to.all())
-
-                task_data = {
-                    'id': task.id,
-                    'title': f"{task.title} ({task.task_list.title} - {assigned_to_name})",
-                    'start': task.deadline.strftime("%Y-%m-%dT%H:%M:%S"),
-                    'color': color,
-                    'extendedProps': {
-                        'title': task.title,
-                        'description': task.description,
-                        'priority': task.priority,
-                        'assignedTo': assigned_to_name,
-                        'completed': task.completed,
-                        'taskListTitle': task.task_list.title,
-                        'category': task.category.name if task.category else "None",
-                    }
-                }
-                tasks_data.append(task_data)
-
-            context['tasks_json'] = json.dumps(tasks_data)
-        return context
+    def invalid_bounds():
+        return JsonResponse({'error': 'Valid start and end parameters are required.'}, status=400)
+
+    @staticmethod
+    def parse_bound(value):
+        if not value:
+            return None
+        try:
+            bound = parse_datetime(value)
+            if bound is None:
+                day = parse_date(value)
+                bound = datetime.combine(day, time.min) if day else None
+        except ValueError:
+            return None
+        if bound is not None and timezone.is_naive(bound):
+            bound = timezone.make_aware(bound)
+        return bound
+
+    def get_queryset(self, start, end):
+        return Task.objects.filter(
+            assigned_to=self.request.user, completed=False, deadline__gte=start, deadline__lt=end,
+            task_list__deleted_at__isnull=True,
+        ).select_related('task_list', 'category').prefetch_related('assigned_to').order_by('deadline')
+
+    def serialize_task(self, task):
+        assigned_to_name = ', '.join(user.username for user in task.assigned_to.all())
+        return {
+            'id': task.id,
+            'title': f"{task.title} ({task.task_list.title} - {assigned_to_name})",
+            'start': task.deadline.strftime("%Y-%m-%dT%H:%M:%S"),
+            'color': self.priority_colors.get(task.priority, '#007bff'),
+            'extendedProps': {
+                'title': task.title,
+                'description': task.description,
+                'priority': task.priority,
+                'assignedTo': assigned_to_name,
+                'completed': task.completed,
+                'taskListTitle': task.task_list.title,
+                'category': task.category.name if task.category else "None",
+            }
+        }
 
 
 class RegisterView(View):
+    query_budget = {'GET': 3, 'POST': 12}
+
     @staticmethod
     def get(request, *args, **kwargs):
         form = UserRegistrationForm()
@@ -337,6 +702,7 @@ class RegisterView(View):
 
 
 class LoginView(FormView):
+    query_budget = {'GET': 3, 'POST': 9}
     form_class = UserLoginForm
     template_name = 'registration/login.html'
     success_url = reverse_lazy('home')
@@ -372,6 +738,8 @@ class LoginView(FormView):
 
 
 class LogoutView(View):
+    query_budget = 5
+
     @staticmethod
     def get(request, *args, **kwargs):
         logout(request)